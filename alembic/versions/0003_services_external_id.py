@@ -0,0 +1,32 @@
+"""add services.external_id for bulk catalog upserts
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 18:04:37.118250
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, Sequence[str], None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Nullable, so existing services keep working until the pricing system sends their keys
+    op.add_column('services', sa.Column('external_id', sa.String(), nullable=True))
+    op.create_index('ix_services_external_id', 'services', ['external_id'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_services_external_id', table_name='services')
+    with op.batch_alter_table('services') as batch_op:
+        batch_op.drop_column('external_id')
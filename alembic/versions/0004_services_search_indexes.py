@@ -0,0 +1,70 @@
+"""full-text search indexes for services
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 18:07:52.630174
+
+SQLite gets an external-content FTS5 table kept in sync by triggers, filled
+from the existing rows; PostgreSQL gets a GIN tsvector index and a trigram
+index on the title.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, Sequence[str], None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SQLITE_FTS_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS services_fts USING fts5("
+    "title, description, content='services', content_rowid='id')",
+    "CREATE TRIGGER IF NOT EXISTS services_fts_ai AFTER INSERT ON services BEGIN "
+    "INSERT INTO services_fts(rowid, title, description) VALUES (new.id, new.title, new.description); "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS services_fts_ad AFTER DELETE ON services BEGIN "
+    "INSERT INTO services_fts(services_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS services_fts_au AFTER UPDATE OF title, description ON services BEGIN "
+    "INSERT INTO services_fts(services_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); "
+    "INSERT INTO services_fts(rowid, title, description) VALUES (new.id, new.title, new.description); "
+    "END",
+    # Index the services that existed before the triggers
+    "INSERT INTO services_fts(services_fts) VALUES ('rebuild')",
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        op.execute(
+            "CREATE INDEX ix_services_search_vector ON services USING gin "
+            "(to_tsvector('english', coalesce(title, '') || ' ' || coalesce(description, '')))"
+        )
+        op.create_index(
+            'ix_services_title_trgm', 'services', ['title'],
+            postgresql_using='gin', postgresql_ops={'title': 'gin_trgm_ops'},
+        )
+    elif dialect == 'sqlite':
+        for statement in SQLITE_FTS_DDL:
+            op.execute(statement)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.drop_index('ix_services_title_trgm', table_name='services')
+        op.drop_index('ix_services_search_vector', table_name='services')
+    elif dialect == 'sqlite':
+        for trigger in ('services_fts_ai', 'services_fts_ad', 'services_fts_au'):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS services_fts")
@@ -0,0 +1,48 @@
+"""per-service rating aggregates
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 18:11:26.954031
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, Sequence[str], None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('service_rating_stats',
+    sa.Column('service_id', sa.Integer(), nullable=False),
+    sa.Column('review_count', sa.Integer(), nullable=False),
+    sa.Column('rating_sum', sa.Integer(), nullable=False),
+    sa.Column('rating_1', sa.Integer(), nullable=False),
+    sa.Column('rating_2', sa.Integer(), nullable=False),
+    sa.Column('rating_3', sa.Integer(), nullable=False),
+    sa.Column('rating_4', sa.Integer(), nullable=False),
+    sa.Column('rating_5', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['service_id'], ['services.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('service_id')
+    )
+    # Backfill from the existing reviews (same aggregate as "python -m app.commands rebuild-ratings")
+    op.execute(
+        "INSERT INTO service_rating_stats "
+        "(service_id, review_count, rating_sum, rating_1, rating_2, rating_3, rating_4, rating_5) "
+        "SELECT bookings.service_id, count(reviews.id), sum(reviews.rating), "
+        + ", ".join(f"sum(CASE WHEN reviews.rating = {rating} THEN 1 ELSE 0 END)" for rating in range(1, 6))
+        + " FROM reviews JOIN bookings ON reviews.booking_id = bookings.id "
+        "GROUP BY bookings.service_id"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('service_rating_stats')
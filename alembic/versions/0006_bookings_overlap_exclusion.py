@@ -0,0 +1,56 @@
+"""exclude overlapping active bookings per service (PostgreSQL)
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 18:15:03.287716
+
+SQLite has no exclusion constraints; admission is serialized there with
+BEGIN IMMEDIATE instead, so this revision only changes PostgreSQL.
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, Sequence[str], None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+OVERLAPPING_BOOKINGS = sa.text(
+    "SELECT a.id, b.id FROM bookings a JOIN bookings b "
+    "ON a.service_id = b.service_id AND a.id < b.id "
+    "AND a.start_time < b.end_time AND b.start_time < a.end_time "
+    "WHERE a.status IN ('PENDING', 'CONFIRMED') AND b.status IN ('PENDING', 'CONFIRMED') "
+    "ORDER BY a.id, b.id LIMIT 20"
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    if not context.is_offline_mode():
+        overlaps = op.get_bind().execute(OVERLAPPING_BOOKINGS).all()
+        if overlaps:
+            pairs = ", ".join(f"{first}/{second}" for first, second in overlaps)
+            raise RuntimeError(
+                f"Active bookings overlap on the same service (booking id pairs, first 20): {pairs}. "
+                "Cancel one booking of each pair, then rerun the upgrade."
+            )
+
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+    op.execute(
+        "ALTER TABLE bookings ADD CONSTRAINT ex_bookings_active_overlap EXCLUDE USING gist "
+        "(service_id WITH =, tstzrange(start_time, end_time, '[)') WITH &&) "
+        "WHERE (status IN ('PENDING', 'CONFIRMED'))"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute("ALTER TABLE bookings DROP CONSTRAINT ex_bookings_active_overlap")
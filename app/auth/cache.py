@@ -0,0 +1,12 @@
+from app.config import settings
+from app.utils.cache import TTLCache
+
+# Principals resolved by get_current_user when AUTH_PRINCIPAL_MODE is "cached"
+principal_cache = TTLCache(
+    maxsize=settings.PRINCIPAL_CACHE_SIZE,
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+)
+
+def invalidate_principal(user_id: int):
+    """Drop a cached principal after the user's row (e.g. role or email) changed."""
+    principal_cache.invalidate(user_id)
@@ -2,16 +2,19 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import settings
 from app.database import get_db
+from app.auth.cache import principal_cache
 from app.auth.jwt import verify_token
 from app.repositories.user import UserRepository
+from app.schemas.auth import Principal
 
 security = HTTPBearer()
 
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: AsyncSession = Depends(get_db)
-):
+) -> Principal:
     token_data = verify_token(credentials.credentials)
     if token_data is None:
         raise HTTPException(
@@ -19,6 +22,15 @@ async def get_current_user(
             detail="Invalid authentication credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
+
+    mode = settings.AUTH_PRINCIPAL_MODE
+    if mode == "claims":
+        return Principal(id=token_data.user_id, email=token_data.email, role=token_data.role)
+
+    if mode == "cached":
+        principal = principal_cache.get(token_data.user_id)
+        if principal is not None:
+            return principal
     
     user_repo = UserRepository(db)
     user = await user_repo.get_by_id(token_data.user_id)
@@ -27,8 +39,11 @@ async def get_current_user(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found",
         )
-    
-    return user
+
+    principal = Principal.model_validate(user)
+    if mode == "cached":
+        principal_cache.set(user.id, principal)
+    return principal
 
 async def get_current_active_user(current_user = Depends(get_current_user)):
     return current_user
@@ -39,4 +54,4 @@ async def require_admin(current_user = Depends(get_current_user)):
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Insufficient permissions"
         )
-    return current_user
\ No newline at end of file
+    return current_user
@@ -1,9 +1,15 @@
+import hashlib
+import time
 from datetime import datetime, timedelta
 from jose import JWTError, jwt
 from fastapi import HTTPException, status
 
 from app.config import settings
 from app.schemas.auth import TokenData
+from app.utils.cache import TTLCache
+
+# Verified tokens keyed by SHA-256 digest; each entry expires at the token's own `exp`.
+_verified_tokens = TTLCache(maxsize=settings.TOKEN_CACHE_SIZE)
 
 def create_access_token(data: dict, expires_delta: timedelta | None = None):
     to_encode = data.copy()
@@ -24,6 +30,27 @@ def create_refresh_token(data: dict):
     return encoded_jwt
 
 def verify_token(token: str) -> TokenData | None:
+    """
+    Verify a JWT and return its claims. Successful verifications are memoized
+    until the token expires, so repeated requests skip the signature check.
+    """
+    key = hashlib.sha256(token.encode()).digest()
+    token_data = _verified_tokens.get(key)
+    if token_data is not None:
+        return token_data
+
+    token_data, exp = _decode_token(token)
+    if token_data is not None and exp is not None:
+        _verified_tokens.set(key, token_data, expires_at=time.monotonic() + (exp - time.time()))
+    return token_data
+
+def token_cache_stats() -> dict:
+    return _verified_tokens.stats()
+
+def clear_token_cache():
+    _verified_tokens.clear()
+
+def _decode_token(token: str) -> tuple[TokenData | None, float | None]:
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
         user_id: int = payload.get("user_id")
@@ -32,8 +59,8 @@ def verify_token(token: str) -> TokenData | None:
         token_type: str = payload.get("type")
         
         if user_id is None or email is None or token_type is None:
-            return None
+            return None, None
             
-        return TokenData(user_id=user_id, email=email, role=role)
+        return TokenData(user_id=user_id, email=email, role=role), payload.get("exp")
     except JWTError:
-        return None
\ No newline at end of file
+        return None, None
@@ -0,0 +1,41 @@
+"""
+Maintenance commands.
+
+    python -m app.commands rebuild-ratings
+"""
+import argparse
+import asyncio
+
+from app.database import AsyncSessionLocal, commit, dispose_engine, get_engine
+from app.repositories.rating import RatingStatsRepository
+
+
+async def rebuild_ratings():
+    async with AsyncSessionLocal() as session:
+        services = await RatingStatsRepository(session).rebuild()
+        await commit(session)
+    print(f"Rebuilt rating aggregates for {services} services")
+
+
+COMMANDS = {
+    "rebuild-ratings": rebuild_ratings,
+}
+
+
+async def run(command: str):
+    get_engine()
+    try:
+        await COMMANDS[command]()
+    finally:
+        await dispose_engine()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=sorted(COMMANDS))
+    args = parser.parse_args()
+    asyncio.run(run(args.command))
+
+
+if __name__ == "__main__":
+    main()
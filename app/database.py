@@ -1,67 +1,354 @@
+import contextlib
+import logging
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Callable, Coroutine
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+from sqlalchemy import event, make_url
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.pool import StaticPool
 from app.config import settings
+from app.utils import sql_stats, statement_budget
+from app.utils.cache import TTLCache
 
-def get_engine():
-    database_url = settings.DATABASE_URL
-    
-    print(f"Environment: {settings.ENV}")
-    print(f"Database URL: {database_url}")
-    
-    if "sqlite" in database_url:
-        print("Configuring SQLite database...")
-        return create_async_engine(
-            database_url,
-            echo=True,
-            connect_args={"check_same_thread": False},
-            poolclass=StaticPool
+logger = logging.getLogger(__name__)
+
+READ_METHODS = ("GET", "HEAD", "OPTIONS")
+
+# Execution option asking the SQLite "begin" hook for BEGIN IMMEDIATE (see begin_write)
+SQLITE_IMMEDIATE = "sqlite_begin_immediate"
+
+# Session.info flag: the current transaction has written (see begin_write)
+WROTE = "wrote"
+
+def _configure_sqlite_transactions(engine):
+    """
+    Have SQLAlchemy emit BEGIN itself instead of pysqlite's implicit
+    transaction handling, so transactions (and SAVEPOINTs) start where the
+    session starts them, and can start as BEGIN IMMEDIATE.
+    """
+    @event.listens_for(engine.sync_engine, "connect")
+    def do_connect(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine.sync_engine, "begin")
+    def do_begin(conn):
+        immediate = conn.get_execution_options().get(SQLITE_IMMEDIATE)
+        conn.exec_driver_sql("BEGIN IMMEDIATE" if immediate else "BEGIN")
+
+def _async_url(url: str) -> str:
+    """Point plain PostgreSQL URLs at the asyncpg driver"""
+    if url.startswith("postgresql://") and "+asyncpg" not in url:
+        url = url.replace("postgresql://", "postgresql+asyncpg://")
+    return url
+
+def database_url() -> str:
+    """The primary database: settings.DATABASE_URL for the asyncpg/aiosqlite drivers"""
+    return _async_url(settings.DATABASE_URL)
+
+def _pool_options() -> dict:
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+    }
+
+def _asyncpg_connect_args() -> dict:
+    """
+    Prepared statement caching for asyncpg. Behind PgBouncer in transaction
+    mode consecutive statements may run on different server connections, so
+    both caches are off and every prepared statement gets a unique name.
+    """
+    if settings.DB_PGBOUNCER:
+        return {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid.uuid4()}__",
+        }
+    return {"prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE}
+
+def create_engine_from_settings(url: str | None = None):
+    url = _async_url(url) if url else database_url()
+    logger.info(
+        "Configuring database",
+        extra={"env": settings.ENV, "database_url": make_url(url).render_as_string(hide_password=True)},
+    )
+
+    if "sqlite" in url:
+        # One shared connection only for in-memory databases, which exist per connection;
+        # file databases get a pool so each session has its own transaction
+        in_memory = make_url(url).database in (None, "", ":memory:")
+        engine = create_async_engine(
+            url,
+            connect_args={"check_same_thread": False, "timeout": settings.SQLITE_BUSY_TIMEOUT_SECONDS},
+            **({"poolclass": StaticPool} if in_memory else _pool_options())
         )
+        _configure_sqlite_transactions(engine)
     else:
-        if database_url.startswith("postgresql://") and "+asyncpg" not in database_url:
-            database_url = database_url.replace("postgresql://", "postgresql+asyncpg://")
-            print(f"Converted to asyncpg URL: {database_url}")
-        
-        print("Configuring PostgreSQL database...")
-        return create_async_engine(
-            database_url,
+        engine = create_async_engine(
+            url,
             echo=False,
-            pool_size=5,
-            max_overflow=10,
-            pool_pre_ping=True,
-            pool_recycle=300,
+            pool_pre_ping=settings.DB_POOL_PRE_PING,
+            pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+            connect_args=_asyncpg_connect_args(),
+            **_pool_options(),
         )
 
-# Create engine using the function
-engine = get_engine()
+    statement_budget.install(engine)
+    if settings.SQL_TIMING_ENABLED:
+        sql_stats.install(engine)
+    if settings.SQL_LOG_SAMPLE_RATE > 0:
+        sql_stats.install_statement_log(engine, settings.SQL_LOG_SAMPLE_RATE)
+    return engine
 
+# Bound to the engine when get_engine() first builds it
 AsyncSessionLocal = sessionmaker(
-    engine, 
     class_=AsyncSession, 
     expire_on_commit=False,
     autoflush=False
 )
 
+# Bound to the replica engine when get_read_engine() first builds it
+AsyncReadSessionLocal = sessionmaker(
+    class_=AsyncSession,
+    expire_on_commit=False,
+    autoflush=False
+)
+
+_engine = None
+_read_engine = None
+# SQLite only: the primary engine with every transaction starting as BEGIN IMMEDIATE (see get_db)
+_immediate_engine = None
+
+# Users who committed a write in the last READ_YOUR_WRITES_SECONDS; their reads go to the
+# primary so they see their own writes despite replication lag. Per worker process.
+recent_writers = TTLCache(maxsize=settings.READ_YOUR_WRITES_CACHE_SIZE, ttl=settings.READ_YOUR_WRITES_SECONDS)
+
+def get_engine():
+    """
+    The process-wide engine, created on first use rather than at import time,
+    so importing the app has no side effects. The app's lifespan calls this
+    on startup; scripts get it through init_db() or by calling it directly.
+    """
+    global _engine, _immediate_engine
+    if _engine is None:
+        _engine = create_engine_from_settings()
+        AsyncSessionLocal.configure(bind=_engine)
+        if _engine.dialect.name == "sqlite":
+            _immediate_engine = _engine.execution_options(**{SQLITE_IMMEDIATE: True})
+    return _engine
+
+def get_read_engine():
+    """Engine for DATABASE_URL_REPLICA, created on first use; the primary engine when no replica is set"""
+    global _read_engine
+    if not settings.DATABASE_URL_REPLICA:
+        return get_engine()
+    if _read_engine is None:
+        _read_engine = create_engine_from_settings(settings.DATABASE_URL_REPLICA)
+        AsyncReadSessionLocal.configure(bind=_read_engine)
+    return _read_engine
+
+async def warm_pool(connections: int, engine=None):
+    """Open up to ``connections`` pooled connections so the first requests don't pay for connecting"""
+    engine = engine or get_engine()
+    pool_size = getattr(engine.sync_engine.pool, "size", lambda: 1)()
+    async with contextlib.AsyncExitStack() as stack:
+        for _ in range(min(connections, pool_size)):
+            connection = await stack.enter_async_context(engine.connect())
+            await connection.exec_driver_sql("SELECT 1")
+
+async def dispose_engine():
+    """Close the pools' connections; the next get_engine()/get_read_engine() builds fresh engines"""
+    global _engine, _read_engine, _immediate_engine
+    _immediate_engine = None
+    if _read_engine is not None:
+        await _read_engine.dispose()
+        _read_engine = None
+    if _engine is not None:
+        await _engine.dispose()
+        _engine = None
+
 Base = declarative_base()
 
+def utcnow() -> datetime:
+    """
+    Client-side timestamp default. Unlike SQLite's CURRENT_TIMESTAMP it keeps
+    microseconds, so stored values sort and compare like the bound parameters
+    used for keyset pagination.
+    """
+    return datetime.now(timezone.utc)
+
 async def init_db():
-    """Initialize database tables"""
+    """
+    Create missing tables straight from the models. For tests, benchmarks and
+    throwaway SQLite databases; deployed databases are migrated with Alembic
+    (``alembic upgrade head``).
+    """
     try:
-        async with engine.begin() as conn:
+        async with get_engine().begin() as conn:
             await conn.run_sync(Base.metadata.create_all)
-        print(f"Database tables created successfully in {settings.ENV} environment!")
-    except Exception as e:
-        print(f"Database initialization failed: {e}")
+        logger.info("Database tables created", extra={"env": settings.ENV})
+    except Exception:
+        logger.exception("Database initialization failed")
         raise
 
-async def get_db():
-    async with AsyncSessionLocal() as session:
+def on_commit(session: AsyncSession, callback):
+    """
+    Run ``callback`` after the session's transaction commits. Used for
+    side effects outside the database (in-process caches and indexes) that
+    must not happen if the request's transaction is rolled back.
+    """
+    session.info.setdefault("on_commit", []).append(callback)
+
+async def commit(session: AsyncSession):
+    """Commit the unit of work, then run its on-commit callbacks"""
+    started = time.perf_counter()
+    await session.commit()
+    sql_stats.record("COMMIT", time.perf_counter() - started)
+    for callback in session.info.pop("on_commit", []):
+        callback()
+
+async def rollback(session: AsyncSession):
+    """Discard the unit of work and its on-commit callbacks"""
+    session.info.pop("on_commit", None)
+    await session.rollback()
+
+@event.listens_for(Session, "do_orm_execute")
+def _note_dml(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info[WROTE] = True
+
+@event.listens_for(Session, "after_flush")
+def _note_flush(session, flush_context):
+    session.info[WROTE] = True
+
+@event.listens_for(Session, "after_transaction_end")
+def _forget_writes(session, transaction):
+    if transaction.parent is None:
+        session.info.pop(WROTE, None)
+
+def _refuse_if_written(session: AsyncSession, caller: str):
+    if session.info.get(WROTE) or session.new or session.dirty or session.deleted or session.info.get("on_commit"):
+        raise RuntimeError(f"{caller} must be called before the unit of work's first write")
+
+async def end_read(session: AsyncSession):
+    """
+    End a transaction that has only read, returning its connection to the
+    pool, before a long await that needs no database (password hashing).
+    Loaded objects stay usable (expire_on_commit=False); the next query
+    starts a new transaction. Raises RuntimeError once the session has written.
+    """
+    _refuse_if_written(session, "end_read()")
+    if session.in_transaction():
+        # Only reads so far; not commit(), which is the unit of work's single commit
+        await session.commit()
+
+async def begin_write(session: AsyncSession):
+    """
+    Call before a check-then-write sequence, such as booking admission, and
+    before the unit of work's first write: it raises RuntimeError once the
+    session has written or queued on-commit callbacks.
+
+    On SQLite the transaction is started with BEGIN IMMEDIATE, which takes
+    the database write lock up front, so concurrent admissions queue up
+    instead of both passing the check (get_db already starts write requests'
+    transactions that way). A transaction holding only the request's
+    earlier reads is ended first. On PostgreSQL this is a no-op:
+    constraints arbitrate concurrent writes there, without locking.
+    """
+    sqlite = session.bind.dialect.name == "sqlite"
+    if sqlite and session.in_transaction():
+        connection = await session.connection()
+        if connection.sync_connection.get_execution_options().get(SQLITE_IMMEDIATE):
+            return
+    _refuse_if_written(session, "begin_write()")
+    if not sqlite:
+        return
+    if session.in_transaction():
+        # Only reads so far; not commit(), which is the unit of work's single commit
+        await session.commit()
+    await session.connection(execution_options={SQLITE_IMMEDIATE: True})
+
+async def get_db(request: Request):
+    """
+    Request-scoped unit of work. Repositories only flush; UnitOfWorkRoute
+    commits once, after the endpoint returns and before the response is
+    sent. Whatever was not committed by then is rolled back here.
+
+    On SQLite the transactions of write requests start with BEGIN IMMEDIATE.
+    A deferred transaction that reads and then writes can't wait for a
+    concurrent writer (SQLite answers "database is locked" at once instead
+    of applying the busy timeout); an immediate one queues for the lock.
+    """
+    get_engine()
+    immediate = _immediate_engine is not None and request.method not in READ_METHODS
+    async with AsyncSessionLocal(**({"bind": _immediate_engine} if immediate else {})) as session:
+        request.state.db = session
+        try:
+            yield session
+        finally:
+            await rollback(session)
+
+def _request_user_id(request: Request) -> int | None:
+    """The user id in the request's bearer token, if it carries a valid one"""
+    from app.auth.jwt import verify_token  # app.auth imports the models, which import this module
+
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    token_data = verify_token(token)
+    return token_data.user_id if token_data is not None else None
+
+async def get_read_db(request: Request):
+    """
+    Session for read-only routes; never committed. With DATABASE_URL_REPLICA
+    set it reads from the replica, except for users in ``recent_writers``,
+    who read from the primary until their writes have had time to replicate.
+    """
+    factory = AsyncSessionLocal
+    if settings.DATABASE_URL_REPLICA:
+        user_id = _request_user_id(request)
+        if user_id is None or recent_writers.get(user_id) is None:
+            get_read_engine()
+            factory = AsyncReadSessionLocal
+    async with factory() as session:
         try:
             yield session
-            await session.commit()
-        except Exception:
+        finally:
             await session.rollback()
-            raise
+
+async def get_primary_read_db():
+    """
+    Read-only session on the primary, never committed, for reads whose
+    result outlives the request (cached responses): rendered from a lagging
+    replica just after a write, the stale result would be served to everyone.
+    """
+    async with AsyncSessionLocal() as session:
+        try:
+            yield session
         finally:
-            await session.close()
\ No newline at end of file
+            await session.rollback()
+
+class UnitOfWorkRoute(APIRoute):
+    """Route class that commits the request's session (see get_db) before responding"""
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        handler = super().get_route_handler()
+
+        async def route_handler(request: Request) -> Response:
+            with statement_budget.track(f"{request.method} {self.path}", self.endpoint):
+                response = await handler(request)
+            session = getattr(request.state, "db", None)
+            if session is not None and response.status_code < 400:
+                await commit(session)
+                if settings.DATABASE_URL_REPLICA and request.method not in READ_METHODS:
+                    user_id = _request_user_id(request)
+                    if user_id is not None:
+                        recent_writers.set(user_id, True)
+            return response
+
+        return route_handler
@@ -1,19 +1,70 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response
+from sqlalchemy.exc import TimeoutError as PoolTimeout
+import asyncio
+import contextlib
 import logging
+import time
 
 from app.config import settings
-from app.database import init_db
+from app.auth.jwt import token_cache_stats
+from app.database import AsyncSessionLocal, dispose_engine, get_engine, get_read_engine, init_db, warm_pool
+from app.services.booking import BookingConflict
+from app.services.leaderboard import leaderboard
+from app.services.service import catalog_cache
+from app.utils.security import password_hasher
+from app.utils.fieldsets import InvalidFields
+from app.utils.pagination import InvalidCursor, NEXT_CURSOR_HEADER
+from app.utils.sql_stats import ServerTimingMiddleware
+from app.utils import metrics as app_metrics
+from app.utils.lifecycle import lifecycle
+from app.utils.logs import RequestIdMiddleware, REQUEST_ID_HEADER, configure_logging, shutdown_logging
 from app.routers import auth, users, services, bookings, reviews
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+@contextlib.asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Schema changes are applied by "alembic upgrade head" before deploying, not here
+    started = time.perf_counter()
+    # Records are queued here and formatted/written on a background thread
+    configure_logging(settings.LOG_LEVEL, settings.LOG_FORMAT)
+    logger.info("Starting up BookIt API...")
+    engine = get_engine()
+    if settings.CREATE_TABLES_ON_STARTUP:
+        await init_db()
+    await warm_pool(settings.DB_POOL_WARMUP)
+    if settings.DATABASE_URL_REPLICA:
+        await warm_pool(settings.DB_POOL_WARMUP, get_read_engine())
+    if settings.METRICS_ENABLED:
+        app_metrics.register_pool_gauges(app_metrics.metrics, engine)
+    leaderboard_task = asyncio.create_task(
+        leaderboard.run_periodically(AsyncSessionLocal, settings.LEADERBOARD_REFRESH_SECONDS)
+    )
+    lifecycle.startup_seconds = time.perf_counter() - started
+    lifecycle.stopping = False
+    lifecycle.ready = True
+    logger.info("BookIt API ready", extra={"startup_ms": round(lifecycle.startup_seconds * 1000, 1)})
+
+    yield
+
+    # uvicorn runs this after in-flight requests finished (or --timeout-graceful-shutdown expired)
+    logger.info("Shutting down BookIt API...")
+    lifecycle.ready = False
+    lifecycle.stopping = True
+    leaderboard_task.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await leaderboard_task
+    password_hasher.shutdown()
+    await dispose_engine()
+    shutdown_logging()
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
     version=settings.VERSION,
-    openapi_url=f"{settings.API_PREFIX}/openapi.json"
+    openapi_url=f"{settings.API_PREFIX}/openapi.json",
+    lifespan=lifespan,
 )
 
 # CORS middleware
@@ -23,8 +74,51 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, REQUEST_ID_HEADER],
 )
 
+if settings.SQL_TIMING_ENABLED:
+    app.add_middleware(ServerTimingMiddleware)
+
+if settings.METRICS_ENABLED:
+    app.add_middleware(app_metrics.MetricsMiddleware)
+    app_metrics.metrics.gauge(
+        "password_hash_queue_depth",
+        "Password hash/verify calls running or queued in the worker pool.",
+        lambda: password_hasher.queue_depth,
+    )
+    app_metrics.register_cache_gauges(app_metrics.metrics, "catalog_cache", "catalog response cache", catalog_cache.stats)
+    app_metrics.register_cache_gauges(app_metrics.metrics, "token_cache", "verified token cache", token_cache_stats)
+
+# Outermost, so every log record of the request (including the ones above) carries its id
+app.add_middleware(RequestIdMiddleware)
+
+@app.exception_handler(InvalidCursor)
+async def invalid_cursor_handler(request: Request, exc: InvalidCursor):
+    return JSONResponse(status_code=status.HTTP_400_BAD_REQUEST, content={"detail": str(exc)})
+
+@app.exception_handler(InvalidFields)
+async def invalid_fields_handler(request: Request, exc: InvalidFields):
+    return JSONResponse(status_code=status.HTTP_400_BAD_REQUEST, content={"detail": str(exc)})
+
+@app.exception_handler(BookingConflict)
+async def booking_conflict_handler(request: Request, exc: BookingConflict):
+    # detail stays the plain message existing clients match on
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={"detail": exc.detail, "conflicting_booking": exc.conflicting_booking},
+    )
+
+@app.exception_handler(PoolTimeout)
+async def pool_timeout_handler(request: Request, exc: PoolTimeout):
+    # Every pooled connection stayed busy for DB_POOL_TIMEOUT seconds: shed the request instead of queueing it
+    logger.warning("Database pool exhausted", extra={"pool_timeout": settings.DB_POOL_TIMEOUT})
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Database is busy, please retry"},
+        headers={"Retry-After": "1"},
+    )
+
 # Include routers
 app.include_router(auth.router, prefix=settings.API_PREFIX)
 app.include_router(users.router, prefix=settings.API_PREFIX)
@@ -32,19 +126,23 @@ app.include_router(services.router, prefix=settings.API_PREFIX)
 app.include_router(bookings.router, prefix=settings.API_PREFIX)
 app.include_router(reviews.router, prefix=settings.API_PREFIX)
 
-@app.on_event("startup")
-async def startup_event():
-    logger.info("Starting up BookIt API...")
-    await init_db()
-
-@app.on_event("shutdown")
-async def shutdown_event():
-    logger.info("Shutting down BookIt API...")
-
 @app.get("/")
 async def root():
     return {"message": "Welcome to BookIt API"}
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"}
\ No newline at end of file
+    return {"status": "healthy"}
+
+@app.get("/ready")
+async def readiness_check():
+    """Readiness probe: 503 until startup warmup is done and again once the app shuts down"""
+    if not lifecycle.ready:
+        return JSONResponse(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, content={"status": lifecycle.state})
+    return {"status": "ready", "startup_ms": round(lifecycle.startup_seconds * 1000, 1)}
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    if not settings.METRICS_ENABLED:
+        return JSONResponse(status_code=status.HTTP_404_NOT_FOUND, content={"detail": "Not Found"})
+    return Response(app_metrics.metrics.render(), media_type=app_metrics.CONTENT_TYPE)
\ No newline at end of file
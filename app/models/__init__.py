@@ -2,5 +2,6 @@ from app.models.user import User
 from app.models.service import Service
 from app.models.booking import Booking
 from app.models.review import Review
+from app.models.rating import ServiceRatingStats
 
-__all__ = ["User", "Service", "Booking", "Review"]
\ No newline at end of file
+__all__ = ["User", "Service", "Booking", "Review", "ServiceRatingStats"]
\ No newline at end of file
@@ -1,7 +1,8 @@
-from sqlalchemy import Column, Integer, String, DateTime, Enum, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Enum, ForeignKey, Index, DDL, event
+from sqlalchemy.dialects.postgresql import ExcludeConstraint
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
-from app.database import Base
+from app.database import Base, utcnow
 import enum
 
 class BookingStatus(str, enum.Enum):
@@ -12,6 +13,12 @@ class BookingStatus(str, enum.Enum):
 
 class Booking(Base):
     __tablename__ = "bookings"
+    __table_args__ = (
+        # Covers the per-service conflict check
+        Index("ix_bookings_service_status_start", "service_id", "status", "start_time"),
+        # Leaderboard refreshes read the bookings created since their horizon
+        Index("ix_bookings_created_at", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -19,7 +26,27 @@ class Booking(Base):
     start_time = Column(DateTime(timezone=True), nullable=False)
     end_time = Column(DateTime(timezone=True), nullable=False)
     status = Column(Enum(BookingStatus), default=BookingStatus.PENDING, nullable=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), default=utcnow, server_default=func.now())
 
-    user = relationship("User")
-    service = relationship("Service")
\ No newline at end of file
+    # Never lazy-loaded: queries that need them say so with joinedload/selectinload
+    user = relationship("User", lazy="raise")
+    service = relationship("Service", lazy="raise")
+
+
+# PostgreSQL: no two active bookings of a service may overlap. Enforced by the
+# database, so concurrent admissions can't double-book; violations are 23P01.
+Booking.__table__.append_constraint(
+    ExcludeConstraint(
+        (Booking.__table__.c.service_id, "="),
+        (func.tstzrange(Booking.__table__.c.start_time, Booking.__table__.c.end_time, "[)"), "&&"),
+        name="ex_bookings_active_overlap",
+        using="gist",
+        where=Booking.__table__.c.status.in_([BookingStatus.PENDING, BookingStatus.CONFIRMED]),
+    ).ddl_if(dialect="postgresql")
+)
+
+event.listen(
+    Booking.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS btree_gist").execute_if(dialect="postgresql"),
+)
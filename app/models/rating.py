@@ -0,0 +1,25 @@
+from sqlalchemy import Column, Integer, ForeignKey
+from app.database import Base
+
+class ServiceRatingStats(Base):
+    """Running review aggregates per service, maintained alongside review writes."""
+    __tablename__ = "service_rating_stats"
+
+    service_id = Column(Integer, ForeignKey("services.id", ondelete="CASCADE"), primary_key=True)
+    review_count = Column(Integer, nullable=False, default=0)
+    rating_sum = Column(Integer, nullable=False, default=0)
+    rating_1 = Column(Integer, nullable=False, default=0)
+    rating_2 = Column(Integer, nullable=False, default=0)
+    rating_3 = Column(Integer, nullable=False, default=0)
+    rating_4 = Column(Integer, nullable=False, default=0)
+    rating_5 = Column(Integer, nullable=False, default=0)
+
+    @property
+    def avg_rating(self) -> float | None:
+        if not self.review_count:
+            return None
+        return self.rating_sum / self.review_count
+
+    @property
+    def histogram(self) -> dict[int, int]:
+        return {rating: getattr(self, f"rating_{rating}") for rating in range(1, 6)}
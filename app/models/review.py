@@ -1,7 +1,7 @@
 from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
-from app.database import Base
+from app.database import Base, utcnow
 
 class Review(Base):
     __tablename__ = "reviews"
@@ -10,6 +10,7 @@ class Review(Base):
     booking_id = Column(Integer, ForeignKey("bookings.id"), nullable=False, unique=True)
     rating = Column(Integer, nullable=False)  # 1-5
     comment = Column(String)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), default=utcnow, server_default=func.now())
 
-    booking = relationship("Booking")
\ No newline at end of file
+    # Never lazy-loaded: queries that need it say so with joinedload/selectinload
+    booking = relationship("Booking", lazy="raise")
\ No newline at end of file
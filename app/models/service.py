@@ -1,14 +1,84 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Float
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Float, Index, DDL, event, text
 from sqlalchemy.sql import func
-from app.database import Base
+from sqlalchemy.orm import relationship
+from app.database import Base, utcnow
+from app.models.rating import ServiceRatingStats
 
 class Service(Base):
     __tablename__ = "services"
 
     id = Column(Integer, primary_key=True, index=True)
+    external_id = Column(String, unique=True, index=True)  # key in the upstream pricing system
     title = Column(String, nullable=False)
     description = Column(String)
     price = Column(Float, nullable=False)
     duration_minutes = Column(Integer, nullable=False)
     is_active = Column(Boolean, default=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
\ No newline at end of file
+    created_at = Column(DateTime(timezone=True), default=utcnow, server_default=func.now())
+
+    rating_stats = relationship(ServiceRatingStats, uselist=False, lazy="joined", viewonly=True)
+
+    @property
+    def avg_rating(self) -> float | None:
+        return self.rating_stats.avg_rating if self.rating_stats else None
+
+    @property
+    def review_count(self) -> int:
+        return self.rating_stats.review_count if self.rating_stats else 0
+
+
+def service_search_vector():
+    """
+    PostgreSQL tsvector over title and description. Constants are inlined so
+    the query expression is identical to the GIN index expression.
+    """
+    return func.to_tsvector(
+        text("'english'"),
+        func.coalesce(Service.__table__.c.title, text("''"))
+        .concat(text("' '"))
+        .concat(func.coalesce(Service.__table__.c.description, text("''"))),
+    )
+
+
+# PostgreSQL: full-text GIN index plus a trigram index on title for typo-tolerant matches
+Index("ix_services_search_vector", service_search_vector(), postgresql_using="gin").ddl_if(dialect="postgresql")
+Index(
+    "ix_services_title_trgm",
+    Service.title,
+    postgresql_using="gin",
+    postgresql_ops={"title": "gin_trgm_ops"},
+).ddl_if(dialect="postgresql")
+
+event.listen(
+    Service.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
+
+# SQLite: external-content FTS5 table kept in sync with services by triggers
+SQLITE_FTS_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS services_fts USING fts5("
+    "title, description, content='services', content_rowid='id')",
+    "CREATE TRIGGER IF NOT EXISTS services_fts_ai AFTER INSERT ON services BEGIN "
+    "INSERT INTO services_fts(rowid, title, description) VALUES (new.id, new.title, new.description); "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS services_fts_ad AFTER DELETE ON services BEGIN "
+    "INSERT INTO services_fts(services_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS services_fts_au AFTER UPDATE OF title, description ON services BEGIN "
+    "INSERT INTO services_fts(services_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); "
+    "INSERT INTO services_fts(rowid, title, description) VALUES (new.id, new.title, new.description); "
+    "END",
+    "INSERT INTO services_fts(services_fts) VALUES ('rebuild')",
+]
+
+for statement in SQLITE_FTS_DDL:
+    event.listen(Service.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+
+event.listen(
+    Service.__table__,
+    "before_drop",
+    DDL("DROP TABLE IF EXISTS services_fts").execute_if(dialect="sqlite"),
+)
@@ -1,12 +1,22 @@
 from typing import Generic, TypeVar, Type, List, Optional
+from sqlalchemy import insert, update, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from pydantic import BaseModel
 
+from app.utils.pagination import InvalidCursor, clamp_limit, decode_cursor, encode_cursor
+
 ModelType = TypeVar("ModelType")
 CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
 UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
 
+def _key_type(column) -> type:
+    """Python type of a sort key column; computed expressions (e.g. relevance scores) are floats"""
+    try:
+        return column.type.python_type
+    except NotImplementedError:
+        return float
+
 class BaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     def __init__(self, model: Type[ModelType], db: AsyncSession):
         self.model = model
@@ -16,43 +26,99 @@ class BaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         result = await self.db.execute(select(self.model).where(self.model.id == id))
         return result.scalar_one_or_none()
 
-    async def get_all(self, skip: int = 0, limit: int = 100) -> List[ModelType]:
-        result = await self.db.execute(select(self.model).offset(skip).limit(limit))
+    async def get_by_ids(self, ids) -> List[ModelType]:
+        result = await self.db.execute(select(self.model).where(self.model.id.in_(list(ids))))
         return result.scalars().all()
 
+    async def get_all(self, cursor: str = None, limit: int = None) -> tuple[List[ModelType], Optional[str]]:
+        rows, next_cursor = await self.paginate(select(self.model), [self.model.id], cursor, limit)
+        return [row[0] for row in rows], next_cursor
+
+    async def paginate(self, stmt, order_by: list, cursor: str = None, limit: int = None, skip: int = 0):
+        """
+        Keyset pagination: order ``stmt`` by ``order_by`` (a unique key, e.g.
+        (created_at, id)) and return one page of rows plus the cursor for the
+        next page, or None on the last page. ``skip`` is only for endpoints
+        that still accept the older offset parameter.
+        """
+        limit = clamp_limit(limit)
+        if cursor:
+            key = decode_cursor(cursor, tuple(_key_type(column) for column in order_by))
+            stmt = stmt.where(tuple_(*order_by) > tuple_(*key))
+
+        result = await self.db.execute(
+            stmt.add_columns(*order_by).order_by(*order_by).offset(skip or None).limit(limit + 1)
+        )
+        rows = result.all()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(*rows[-1][-len(order_by):])
+        return [row[:-len(order_by)] for row in rows], next_cursor
+
+    async def paginate_by_offset(self, stmt, order_by: list, cursor: str = None, limit: int = None, max_results: int = 1000):
+        """
+        Offset pagination for orderings that are not a stable key, such as
+        relevance scores, which change as rows are written between pages. The
+        cursor carries the offset; paging stops ``max_results`` rows deep.
+        """
+        limit = clamp_limit(limit)
+        offset = decode_cursor(cursor, (int,))[0] if cursor else 0
+        if not 0 <= offset < max_results:
+            raise InvalidCursor("Invalid pagination cursor")
+        limit = min(limit, max_results - offset)
+
+        result = await self.db.execute(stmt.order_by(*order_by).offset(offset).limit(limit + 1))
+        rows = result.all()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            if offset + limit < max_results:
+                next_cursor = encode_cursor(offset + limit)
+        return rows, next_cursor
+
     async def create(self, obj_in: CreateSchemaType) -> ModelType:
+        """
+        Insert a row and load it from the INSERT's RETURNING clause, without a
+        refresh SELECT. Like every repository write it does not commit: the
+        request's unit of work does (see get_db).
+        """
         # FIX: Check if it's a dict or Pydantic model
         if hasattr(obj_in, 'dict'):
             # It's a Pydantic model
-            db_obj = self.model(**obj_in.dict())
+            values = obj_in.dict()
         else:
             # It's already a dictionary
-            db_obj = self.model(**obj_in)
-            
-        self.db.add(db_obj)
-        await self.db.commit()
-        await self.db.refresh(db_obj)
-        return db_obj
+            values = obj_in
+
+        result = await self.db.execute(insert(self.model).values(**values).returning(self.model))
+        return result.scalar_one()
 
     async def update(self, id: int, obj_in: UpdateSchemaType) -> Optional[ModelType]:
-        db_obj = await self.get_by_id(id)
-        if db_obj:
-            # FIX: Handle both dict and Pydantic model
-            if hasattr(obj_in, 'dict'):
-                update_data = obj_in.dict(exclude_unset=True)
-            else:
-                update_data = obj_in
-                
-            for field, value in update_data.items():
-                setattr(db_obj, field, value)
-            await self.db.commit()
-            await self.db.refresh(db_obj)
-        return db_obj
+        """Update a row by id and load it from the UPDATE's RETURNING clause; None if it doesn't exist"""
+        # FIX: Handle both dict and Pydantic model
+        if hasattr(obj_in, 'dict'):
+            update_data = obj_in.dict(exclude_unset=True)
+        else:
+            update_data = obj_in
+
+        if not update_data:
+            return await self.get_by_id(id)
+
+        result = await self.db.execute(
+            update(self.model)
+            .where(self.model.id == id)
+            .values(**update_data)
+            .returning(self.model)
+        )
+        return result.scalar_one_or_none()
 
     async def delete(self, id: int) -> bool:
         db_obj = await self.get_by_id(id)
         if db_obj:
             await self.db.delete(db_obj)
-            await self.db.commit()
+            await self.db.flush()
             return True
         return False
\ No newline at end of file
@@ -1,16 +1,48 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy import and_, or_
+from sqlalchemy.orm import joinedload
+from sqlalchemy import insert, func
+from sqlalchemy.exc import IntegrityError
 from datetime import datetime
-from app.models.booking import Booking
+from app.models.booking import Booking, BookingStatus
 from app.models.service import Service
 from app.schemas.booking import BookingCreate, BookingUpdate
 from app.repositories.base import BaseRepository
 
+ACTIVE_STATUSES = [BookingStatus.PENDING, BookingStatus.CONFIRMED]
+
+# SQLSTATE raised by PostgreSQL when a write breaks ex_bookings_active_overlap
+EXCLUSION_VIOLATION = "23P01"
+
+def is_overlap_violation(error: IntegrityError) -> bool:
+    return getattr(error.orig, "sqlstate", None) == EXCLUSION_VIOLATION
+
+# Flat booking + service columns for list pages and exports; names match BookingWithServiceResponse
+BOOKING_ROW_COLUMNS = (
+    Booking.id,
+    Booking.user_id,
+    Booking.service_id,
+    Booking.start_time,
+    Booking.end_time,
+    Booking.status,
+    Booking.created_at,
+    Service.title.label("service_title"),
+    Service.price.label("service_price"),
+    Service.duration_minutes.label("service_duration"),
+)
+BOOKING_ROW_KEYS = tuple(column.key for column in BOOKING_ROW_COLUMNS)
+BOOKING_FIELD_COLUMNS = {column.key: column for column in BOOKING_ROW_COLUMNS}
+SERVICE_ROW_KEYS = {"service_title", "service_price", "service_duration"}
+
 class BookingRepository(BaseRepository[Booking, BookingCreate, BookingUpdate]):
     def __init__(self, db: AsyncSession):
         super().__init__(Booking, db)
 
+    @property
+    def enforces_no_overlap(self) -> bool:
+        """Whether the database itself rejects overlapping active bookings (PostgreSQL's exclusion constraint)"""
+        return self.db.bind.dialect.name == "postgresql"
+
     async def get_user_bookings(self, user_id: int, skip: int = 0, limit: int = 100):
         result = await self.db.execute(
             select(Booking).where(Booking.user_id == user_id).offset(skip).limit(limit)
@@ -33,28 +65,24 @@ class BookingRepository(BaseRepository[Booking, BookingCreate, BookingUpdate]):
         return result.scalars().all()
 
     async def get_booking_with_service(self, booking_id: int):
-        """Get booking with service details"""
+        """Get (booking, service), loading the service in the same query"""
         result = await self.db.execute(
-            select(Booking, Service)
-            .join(Service, Booking.service_id == Service.id)
+            select(Booking)
+            .options(joinedload(Booking.service, innerjoin=True))
             .where(Booking.id == booking_id)
         )
-        return result.first()
+        booking = result.scalar_one_or_none()
+        return (booking, booking.service) if booking else None
 
-    async def get_user_bookings_with_services(self, user_id: int, skip: int = 0, limit: int = 100):
-        """Get user bookings with service details"""
-        result = await self.db.execute(
-            select(Booking, Service)
-            .join(Service, Booking.service_id == Service.id)
-            .where(Booking.user_id == user_id)
-            .offset(skip)
-            .limit(limit)
-        )
-        return result.all()
+    def _bookings_with_services_stmt(self, user_id: int = None, status: str = None, from_date: datetime = None, to_date: datetime = None, fields: tuple[str, ...] = None):
+        """Select BOOKING_ROW_COLUMNS, or only the columns named by ``fields``; services are joined only when needed"""
+        fields = fields or BOOKING_ROW_KEYS
+        stmt = select(*(BOOKING_FIELD_COLUMNS[field] for field in fields)).select_from(Booking)
+        if not SERVICE_ROW_KEYS.isdisjoint(fields):
+            stmt = stmt.join(Service, Booking.service_id == Service.id)
 
-    async def get_all_bookings_with_services(self, status: str = None, from_date: datetime = None, to_date: datetime = None):
-        """Get all bookings with service details (for admin)"""
-        stmt = select(Booking, Service).join(Service, Booking.service_id == Service.id)
+        if user_id is not None:
+            stmt = stmt.where(Booking.user_id == user_id)
         
         if status:
             stmt = stmt.where(Booking.status == status)
@@ -64,25 +92,113 @@ class BookingRepository(BaseRepository[Booking, BookingCreate, BookingUpdate]):
         
         if to_date:
             stmt = stmt.where(Booking.start_time <= to_date)
-        
-        result = await self.db.execute(stmt)
+
+        return stmt
+
+    async def get_user_bookings_with_services(self, user_id: int, status: str = None, from_date: datetime = None, to_date: datetime = None, cursor: str = None, limit: int = None, fields: tuple[str, ...] = None):
+        """Get one page of a user's flat booking + service rows (``fields`` or BOOKING_ROW_KEYS), ordered by (start_time, id)"""
+        stmt = self._bookings_with_services_stmt(user_id, status, from_date, to_date, fields)
+        return await self.paginate(stmt, [Booking.start_time, Booking.id], cursor, limit)
+
+    async def get_all_bookings_with_services(self, status: str = None, from_date: datetime = None, to_date: datetime = None, cursor: str = None, limit: int = None, fields: tuple[str, ...] = None):
+        """Get one page of all flat booking + service rows (for admin), ordered by (start_time, id)"""
+        stmt = self._bookings_with_services_stmt(None, status, from_date, to_date, fields)
+        return await self.paginate(stmt, [Booking.start_time, Booking.id], cursor, limit)
+
+    async def stream_bookings_with_services(self, status: str = None, from_date: datetime = None, to_date: datetime = None, batch_size: int = 1000):
+        """Stream flat booking + service rows through a server-side cursor, ordered by (start_time, id)"""
+        stmt = self._bookings_with_services_stmt(None, status, from_date, to_date)
+        stmt = stmt.order_by(Booking.start_time, Booking.id).execution_options(yield_per=batch_size)
+        result = await self.db.stream(stmt)
+        async for partition in result.partitions():
+            yield partition
+
+    async def count_created_by_day(self, since: datetime, before: datetime):
+        """Get (service_id, day, count) of bookings created in [since, before), excluding cancelled ones"""
+        day = func.date(Booking.created_at)
+        result = await self.db.execute(
+            select(Booking.service_id, day, func.count(Booking.id))
+            .where(
+                Booking.created_at >= since,
+                Booking.created_at < before,
+                Booking.status != BookingStatus.CANCELLED,
+            )
+            .group_by(Booking.service_id, day)
+        )
         return result.all()
 
-    async def check_booking_conflict(self, service_id: int, start_time: datetime, end_time: datetime, exclude_booking_id: int = None):
-        stmt = select(Booking).where(
-            and_(
+    async def get_created_since(self, since: datetime, limit: int):
+        """Get (id, service_id, created_at, status) of bookings created at or after a point in time, oldest first"""
+        result = await self.db.execute(
+            select(Booking.id, Booking.service_id, Booking.created_at, Booking.status)
+            .where(Booking.created_at >= since)
+            .order_by(Booking.created_at, Booking.id)
+            .limit(limit)
+        )
+        return result.all()
+
+    async def get_active_intervals(self, service_id: int):
+        """Get (id, start_time, end_time) of every pending/confirmed booking of a service"""
+        result = await self.db.execute(
+            select(Booking.id, Booking.start_time, Booking.end_time)
+            .where(
+                Booking.service_id == service_id,
+                Booking.status.in_(ACTIVE_STATUSES),
+            )
+            .order_by(Booking.start_time)
+        )
+        return result.all()
+
+    async def get_active_intervals_in_window(self, service_id: int, from_date: datetime, to_date: datetime):
+        """Get (start_time, end_time) of active bookings overlapping a window, ordered by start"""
+        result = await self.db.execute(
+            select(Booking.start_time, Booking.end_time)
+            .where(
                 Booking.service_id == service_id,
-                Booking.status.in_(["pending", "confirmed"]),
-                or_(
-                    and_(Booking.start_time <= start_time, Booking.end_time > start_time),
-                    and_(Booking.start_time < end_time, Booking.end_time >= end_time),
-                    and_(Booking.start_time >= start_time, Booking.end_time <= end_time)
-                )
+                Booking.status.in_(ACTIVE_STATUSES),
+                Booking.start_time < to_date,
+                Booking.end_time > from_date,
             )
+            .order_by(Booking.start_time)
+        )
+        return result.all()
+
+    async def get_active_intervals_for_services(self, service_ids, from_date: datetime, to_date: datetime):
+        """Get (service_id, id, start_time, end_time) of active bookings of several services overlapping a window"""
+        result = await self.db.execute(
+            select(Booking.service_id, Booking.id, Booking.start_time, Booking.end_time)
+            .where(
+                Booking.service_id.in_(list(service_ids)),
+                Booking.status.in_(ACTIVE_STATUSES),
+                Booking.start_time < to_date,
+                Booking.end_time > from_date,
+            )
+        )
+        return result.all()
+
+    async def bulk_create(self, rows: list[dict], chunk_size: int = 1000) -> list[int]:
+        """Insert bookings in chunks and return their ids in input order"""
+        ids = []
+        stmt = insert(Booking).returning(Booking.id, sort_by_parameter_order=True)
+        for offset in range(0, len(rows), chunk_size):
+            result = await self.db.execute(stmt, rows[offset:offset + chunk_size])
+            ids.extend(result.scalars().all())
+        return ids
+
+    async def find_conflicting_booking(self, service_id: int, start_time: datetime, end_time: datetime, exclude_booking_id: int = None):
+        stmt = select(Booking).where(
+            Booking.service_id == service_id,
+            Booking.status.in_(ACTIVE_STATUSES),
+            Booking.start_time < end_time,
+            Booking.end_time > start_time,
         )
         
         if exclude_booking_id:
             stmt = stmt.where(Booking.id != exclude_booking_id)
         
-        result = await self.db.execute(stmt)
-        return result.scalar_one_or_none() is not None
\ No newline at end of file
+        result = await self.db.execute(stmt.limit(1))
+        return result.scalar_one_or_none()
+
+    async def check_booking_conflict(self, service_id: int, start_time: datetime, end_time: datetime, exclude_booking_id: int = None):
+        booking = await self.find_conflicting_booking(service_id, start_time, end_time, exclude_booking_id)
+        return booking is not None
@@ -0,0 +1,75 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy import delete, insert, func, case
+from sqlalchemy.dialects import postgresql, sqlite
+from app.models.rating import ServiceRatingStats
+from app.models.review import Review
+from app.models.booking import Booking
+from app.models.service import Service
+
+COUNTER_FIELDS = ("review_count", "rating_sum", "rating_1", "rating_2", "rating_3", "rating_4", "rating_5")
+
+class RatingStatsRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get(self, service_id: int) -> ServiceRatingStats | None:
+        result = await self.db.execute(
+            select(ServiceRatingStats).where(ServiceRatingStats.service_id == service_id)
+        )
+        return result.scalar_one_or_none()
+
+    async def top_rated(self, limit: int, min_reviews: int = 1):
+        """Get (service_id, title, avg_rating, review_count) of the best rated active services"""
+        avg_rating = ServiceRatingStats.rating_sum * 1.0 / ServiceRatingStats.review_count
+        result = await self.db.execute(
+            select(Service.id, Service.title, avg_rating, ServiceRatingStats.review_count)
+            .join(Service, Service.id == ServiceRatingStats.service_id)
+            .where(
+                Service.is_active == True,
+                ServiceRatingStats.review_count >= max(min_reviews, 1),
+            )
+            .order_by(avg_rating.desc(), ServiceRatingStats.review_count.desc(), Service.id)
+            .limit(limit)
+        )
+        return result.all()
+
+    async def apply(self, service_id: int, added: int = None, removed: int = None):
+        """
+        Add and/or remove one rating from a service's aggregates with a single
+        upsert. It runs in the request's transaction, so the aggregates
+        commit together with the review write.
+        """
+        deltas = dict.fromkeys(COUNTER_FIELDS, 0)
+        for rating, sign in ((added, 1), (removed, -1)):
+            if rating is not None:
+                deltas["review_count"] += sign
+                deltas["rating_sum"] += sign * rating
+                deltas[f"rating_{rating}"] += sign
+
+        dialect = postgresql if self.db.bind.dialect.name == "postgresql" else sqlite
+        table = ServiceRatingStats.__table__
+        stmt = dialect.insert(table).values(service_id=service_id, **deltas)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.service_id],
+            set_={field: table.c[field] + stmt.excluded[field] for field in COUNTER_FIELDS},
+        )
+        await self.db.execute(stmt)
+
+    async def rebuild(self) -> int:
+        """Recompute every service's aggregates from the reviews table"""
+        aggregates = (
+            select(
+                Booking.service_id,
+                func.count(Review.id),
+                func.sum(Review.rating),
+                *(func.sum(case((Review.rating == rating, 1), else_=0)) for rating in range(1, 6)),
+            )
+            .join(Booking, Review.booking_id == Booking.id)
+            .group_by(Booking.service_id)
+        )
+        await self.db.execute(delete(ServiceRatingStats))
+        result = await self.db.execute(
+            insert(ServiceRatingStats).from_select(["service_id", *COUNTER_FIELDS], aggregates)
+        )
+        return result.rowcount
@@ -1,24 +1,46 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy.orm import joinedload
 from app.models.review import Review
 from app.schemas.review import ReviewCreate, ReviewUpdate
 from app.repositories.base import BaseRepository
 
+# ReviewResponse field -> column, for sparse fieldsets
+REVIEW_FIELD_COLUMNS = {column.key: column for column in Review.__table__.columns}
+
 class ReviewRepository(BaseRepository[Review, ReviewCreate, ReviewUpdate]):
     def __init__(self, db: AsyncSession):
         super().__init__(Review, db)
 
+    async def get_with_booking(self, review_id: int) -> Review | None:
+        """Get a review with its booking loaded in the same query"""
+        result = await self.db.execute(
+            select(Review)
+            .options(joinedload(Review.booking, innerjoin=True))
+            .where(Review.id == review_id)
+        )
+        return result.scalar_one_or_none()
+
     async def get_by_booking_id(self, booking_id: int):
         result = await self.db.execute(select(Review).where(Review.booking_id == booking_id))
         return result.scalar_one_or_none()
 
-    async def get_service_reviews(self, service_id: int, skip: int = 0, limit: int = 100):
+    async def get_service_reviews(self, service_id: int, cursor: str = None, limit: int = None, fields: tuple[str, ...] = None, skip: int = 0):
+        """
+        Get one page of a service's reviews, ordered by (created_at, id). With
+        ``fields``, only those columns are selected and rows are plain dicts.
+        ``skip`` offsets the page, for clients of the older offset API.
+        """
         from app.models.booking import Booking
-        result = await self.db.execute(
-            select(Review)
-            .join(Booking, Review.booking_id == Booking.id)
+        if fields is None:
+            stmt = select(Review)
+        else:
+            stmt = select(*(REVIEW_FIELD_COLUMNS[field] for field in fields)).select_from(Review)
+        stmt = (
+            stmt.join(Booking, Review.booking_id == Booking.id)
             .where(Booking.service_id == service_id)
-            .offset(skip)
-            .limit(limit)
         )
-        return result.scalars().all()
\ No newline at end of file
+        rows, next_cursor = await self.paginate(stmt, [Review.created_at, Review.id], cursor, limit, skip)
+        if fields is None:
+            return [row[0] for row in rows], next_cursor
+        return [dict(zip(fields, row)) for row in rows], next_cursor
\ No newline at end of file
@@ -1,27 +1,72 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from app.models.service import Service
-from app.schemas.service import ServiceCreate, ServiceUpdate
+import re
+from sqlalchemy import or_, func, literal_column, table, column, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm.attributes import set_committed_value
+from app.models.service import Service, service_search_vector
+from app.models.rating import ServiceRatingStats
+from app.schemas.service import ServiceCreate, ServiceUpdate, ServiceUpsert
 from app.repositories.base import BaseRepository
 
+services_fts = table("services_fts", column("rowid"), column("services_fts"))
+
+def _fts5_query(query: str) -> str | None:
+    """Turn free text into an FTS5 query: every word must match, as a prefix."""
+    words = re.findall(r"\w+", query)
+    return " ".join(f'"{word}"*' for word in words) or None
+
+UPSERT_FIELDS = ("title", "description", "price", "duration_minutes", "is_active")
+
+# ServiceResponse field -> column, for sparse fieldsets
+SERVICE_FIELD_COLUMNS = {
+    **{column.key: column for column in Service.__table__.columns},
+    "avg_rating": (
+        ServiceRatingStats.rating_sum * 1.0 / func.nullif(ServiceRatingStats.review_count, 0)
+    ).label("avg_rating"),
+    "review_count": func.coalesce(ServiceRatingStats.review_count, 0).label("review_count"),
+}
+RATING_FIELDS = {"avg_rating", "review_count"}
+
 class ServiceRepository(BaseRepository[Service, ServiceCreate, ServiceUpdate]):
     def __init__(self, db: AsyncSession):
         super().__init__(Service, db)
 
+    async def create(self, obj_in: ServiceCreate) -> Service:
+        service = await super().create(obj_in)
+        # RETURNING doesn't run the rating_stats join; a new service has no ratings yet
+        set_committed_value(service, "rating_stats", None)
+        return service
+
     async def get_active_services(self, skip: int = 0, limit: int = 100):
         result = await self.db.execute(
             select(Service).where(Service.is_active == True).offset(skip).limit(limit)
         )
         return result.scalars().all()
 
-    async def search_services(self, query: str = None, min_price: float = None, max_price: float = None, active: bool = True):
-        stmt = select(Service)
+    async def search_services(self, query: str = None, min_price: float = None, max_price: float = None, active: bool = True, cursor: str = None, limit: int = None, fields: tuple[str, ...] = None, max_results: int = 1000):
+        """
+        Get one page of matching services. Text queries are ranked by relevance
+        (FTS5 bm25 on SQLite, ts_rank/trigram similarity on PostgreSQL) and
+        paged by offset, at most ``max_results`` deep; otherwise services are
+        keyset-paged in (created_at, id) order.
+
+        With ``fields``, only those columns are selected and rows come back as
+        plain dicts instead of Service entities.
+        """
+        if fields is None:
+            stmt = select(Service)
+        else:
+            stmt = select(*(SERVICE_FIELD_COLUMNS[field] for field in fields)).select_from(Service)
+            if not RATING_FIELDS.isdisjoint(fields):
+                stmt = stmt.outerjoin(ServiceRatingStats, ServiceRatingStats.service_id == Service.id)
+        order_by = [Service.created_at, Service.id]
         
         if active:
             stmt = stmt.where(Service.is_active == True)
         
         if query:
-            stmt = stmt.where(Service.title.ilike(f"%{query}%"))
+            stmt, order_by = self._text_search(stmt, query)
         
         if min_price is not None:
             stmt = stmt.where(Service.price >= min_price)
@@ -29,5 +74,71 @@ class ServiceRepository(BaseRepository[Service, ServiceCreate, ServiceUpdate]):
         if max_price is not None:
             stmt = stmt.where(Service.price <= max_price)
         
-        result = await self.db.execute(stmt)
-        return result.scalars().all()
\ No newline at end of file
+        if query:
+            rows, next_cursor = await self.paginate_by_offset(stmt, order_by, cursor, limit, max_results)
+        else:
+            rows, next_cursor = await self.paginate(stmt, order_by, cursor, limit)
+        if fields is None:
+            return [row[0] for row in rows], next_cursor
+        return [dict(zip(fields, row)) for row in rows], next_cursor
+
+    def _text_search(self, stmt, query: str):
+        """Add a relevance filter to stmt and return it with an ascending (score, id) ordering"""
+        if self.db.bind.dialect.name == "postgresql":
+            tsquery = func.websearch_to_tsquery(text("'english'"), query)
+            vector = service_search_vector()
+            score = func.greatest(func.ts_rank(vector, tsquery), func.similarity(Service.title, query))
+            stmt = stmt.where(or_(vector.op("@@")(tsquery), Service.title.op("%")(query)))
+            return stmt, [-score, Service.id]
+
+        match = _fts5_query(query)
+        if match is None:
+            return stmt.where(False), [Service.id]
+        # bm25 is lower-is-better; title matches weigh more than description matches
+        score = func.bm25(literal_column("services_fts"), 10.0, 1.0)
+        stmt = (
+            stmt.join(services_fts, services_fts.c.rowid == Service.id)
+            .where(literal_column("services_fts").op("MATCH")(match))
+        )
+        return stmt, [score, Service.id]
+
+    async def bulk_upsert(self, items: list[ServiceUpsert], chunk_size: int = 1000) -> dict:
+        """
+        Insert or update services by external_id with INSERT ... ON CONFLICT,
+        in chunks inside one transaction. Rows whose fields are unchanged are
+        not sent, and the conflict clause only rewrites rows that differ.
+        """
+        # external_ids are unique within items; ServiceService rejects payloads that repeat one
+        by_key = {item.external_id: item.dict(include={"external_id", *UPSERT_FIELDS}) for item in items}
+
+        result = await self.db.execute(
+            select(Service.external_id, *(getattr(Service, field) for field in UPSERT_FIELDS))
+            .where(Service.external_id.in_(list(by_key)))
+        )
+        existing = {row[0]: row[1:] for row in result.all()}
+
+        created = updated = unchanged = 0
+        pending = []
+        for key, values in by_key.items():
+            current = existing.get(key)
+            if current is None:
+                created += 1
+            elif tuple(values[field] for field in UPSERT_FIELDS) == tuple(current):
+                unchanged += 1
+                continue
+            else:
+                updated += 1
+            pending.append(values)
+
+        if pending:
+            dialect = postgresql if self.db.bind.dialect.name == "postgresql" else sqlite
+            stmt = dialect.insert(Service)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[Service.external_id],
+                set_={field: stmt.excluded[field] for field in UPSERT_FIELDS},
+                where=or_(*(getattr(Service, field).is_distinct_from(stmt.excluded[field]) for field in UPSERT_FIELDS)),
+            )
+            for offset in range(0, len(pending), chunk_size):
+                await self.db.execute(stmt, pending[offset:offset + chunk_size])
+
+        return {"created": created, "updated": updated, "unchanged": unchanged}
@@ -1,12 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
+from app.database import get_db, UnitOfWorkRoute
 from app.schemas.auth import UserLogin, UserRegister, Token, RefreshToken
 from app.services.auth import AuthService
 from app.auth.jwt import verify_token, create_access_token
 
-router = APIRouter(prefix="/auth", tags=["auth"])
+router = APIRouter(prefix="/auth", tags=["auth"], route_class=UnitOfWorkRoute)
 
 @router.post("/register", response_model=Token, status_code=status.HTTP_201_CREATED)
 async def register(user_data: UserRegister, db: AsyncSession = Depends(get_db)):
@@ -14,11 +14,8 @@ async def register(user_data: UserRegister, db: AsyncSession = Depends(get_db)):
     auth_service = AuthService(db)
     try:
         user = await auth_service.register(user_data)
-        # Auto-login after registration
-        return await auth_service.login(UserLogin(
-            email=user_data.email, 
-            password=user_data.password
-        ))
+        # Auto-login after registration; the password was just hashed, so it isn't verified again
+        return auth_service.issue_tokens(user)
     except HTTPException:
         # Re-raise HTTP exceptions
         raise
@@ -1,14 +1,19 @@
-from fastapi import APIRouter, Depends, Query, HTTPException, status
+from fastapi import APIRouter, Depends, Query, HTTPException, status, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime
 from typing import Optional
 
-from app.database import get_db
+from app.database import get_db, get_read_db, UnitOfWorkRoute
 from app.auth.dependencies import get_current_active_user, require_admin
-from app.schemas.booking import BookingResponse, BookingWithServiceResponse, BookingCreate, BookingUpdate
-from app.services.booking import BookingService
+from app.schemas.booking import BookingResponse, BookingWithServiceResponse, BookingCreate, BookingUpdate, BookingBulkItem, BookingBulkReport
+from app.services.booking import BookingService, read_bulk_rows
+from app.utils.fieldsets import parse_fields
+from app.utils.pagination import set_next_cursor
+from app.utils.serialization import RowsJSONResponse
+from app.utils.statement_budget import statement_budget
 
-router = APIRouter(prefix="/bookings", tags=["bookings"])
+router = APIRouter(prefix="/bookings", tags=["bookings"], route_class=UnitOfWorkRoute)
 
 @router.post("/", response_model=BookingWithServiceResponse, status_code=201)
 async def create_booking(
@@ -17,29 +22,86 @@ async def create_booking(
     current_user = Depends(get_current_active_user)
 ):
     booking_service = BookingService(db)
-    booking = await booking_service.create_booking(current_user.id, booking_data)
-    # Return booking with service details
-    return await booking_service.get_booking_with_service(booking.id)
+    return await booking_service.create_booking(current_user.id, booking_data)
+
+@router.post(
+    "/bulk",
+    response_model=BookingBulkReport,
+    openapi_extra={
+        "requestBody": {
+            "content": {
+                "application/json": {"schema": {"type": "array", "items": BookingBulkItem.model_json_schema()}},
+                "text/csv": {"schema": {"type": "string"}},
+            },
+            "required": True,
+        }
+    },
+)
+@statement_budget(None)  # one insert per chunk, so it grows with the upload
+async def bulk_create_bookings(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    admin_user = Depends(require_admin)
+):
+    """
+    Import bookings from a JSON array or a CSV with a service_id,start_time[,user_id,status] header (admin only).
+    Rows without user_id are booked for the calling admin.
+    """
+    rows = await read_bulk_rows(request.headers.get("content-type", ""), request.stream())
+    booking_service = BookingService(db)
+    return await booking_service.bulk_create_bookings(rows, admin_user.id)
 
 @router.get("/", response_model=list[BookingWithServiceResponse])
 async def get_bookings(
     status: Optional[str] = Query(None),
     from_date: Optional[datetime] = Query(None),
     to_date: Optional[datetime] = Query(None),
-    db: AsyncSession = Depends(get_db),
+    cursor: Optional[str] = Query(None),
+    limit: Optional[int] = Query(None, ge=1),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,start_time,status,service_title"),
+    db: AsyncSession = Depends(get_read_db),
     current_user = Depends(get_current_active_user)
 ):
     booking_service = BookingService(db)
+    selected = parse_fields(fields, BookingWithServiceResponse)
     
     if current_user.role == "admin":
-        return await booking_service.get_all_bookings_with_filters(status, from_date, to_date)
+        bookings, next_cursor = await booking_service.get_all_bookings_with_filters(status, from_date, to_date, cursor, limit, selected)
     else:
-        return await booking_service.get_user_bookings(current_user.id)
+        bookings, next_cursor = await booking_service.get_user_bookings(current_user.id, status, from_date, to_date, cursor, limit, selected)
+
+    # Rows go straight to orjson; response_model only documents the shape
+    response = RowsJSONResponse(bookings)
+    set_next_cursor(response, next_cursor)
+    return response
+
+@router.get("/export")
+async def export_bookings(
+    export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+    status: Optional[str] = Query(None),
+    from_date: Optional[datetime] = Query(None),
+    to_date: Optional[datetime] = Query(None),
+    db: AsyncSession = Depends(get_read_db),
+    admin_user = Depends(require_admin)
+):
+    """
+    Stream all bookings with service details as NDJSON or CSV (admin only).
+    """
+    booking_service = BookingService(db)
+    rows = booking_service.export_bookings(export_format, status, from_date, to_date)
+
+    if export_format == "csv":
+        return StreamingResponse(
+            rows,
+            media_type="text/csv",
+            headers={"Content-Disposition": 'attachment; filename="bookings.csv"'},
+        )
+    return StreamingResponse(rows, media_type="application/x-ndjson")
 
 @router.get("/{booking_id}", response_model=BookingWithServiceResponse)
 async def get_booking(
     booking_id: int,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user = Depends(get_current_active_user)
 ):
     booking_service = BookingService(db)
@@ -62,8 +124,7 @@ async def update_booking(
     current_user = Depends(get_current_active_user)
 ):
     booking_service = BookingService(db)
-    updated_booking = await booking_service.update_booking(booking_id, booking_update, current_user)
-    return await booking_service.get_booking_with_service(booking_id)
+    return await booking_service.update_booking(booking_id, booking_update, current_user)
 
 @router.delete("/{booking_id}")
 async def delete_booking(
@@ -1,12 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
 
-from app.database import get_db
+from app.database import get_db, get_read_db, UnitOfWorkRoute
 from app.auth.dependencies import get_current_active_user, require_admin
 from app.schemas.review import ReviewResponse, ReviewCreate, ReviewUpdate
 from app.services.review import ReviewService
+from app.utils.fieldsets import parse_fields
+from app.utils.pagination import set_next_cursor
+from app.utils.serialization import RowsJSONResponse
 
-router = APIRouter(prefix="/reviews", tags=["reviews"])
+router = APIRouter(prefix="/reviews", tags=["reviews"], route_class=UnitOfWorkRoute)
 
 @router.post("/", response_model=ReviewResponse, status_code=201)
 async def create_review(
@@ -20,12 +24,23 @@ async def create_review(
 @router.get("/services/{service_id}/reviews", response_model=list[ReviewResponse])
 async def get_service_reviews(
     service_id: int,
-    skip: int = 0,
-    limit: int = 100,
-    db: AsyncSession = Depends(get_db)
+    response: Response,
+    skip: int = Query(0, ge=0, description="Deprecated offset paging; prefer cursor"),
+    cursor: Optional[str] = Query(None),
+    limit: Optional[int] = Query(None, ge=1),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,rating,comment"),
+    db: AsyncSession = Depends(get_read_db)
 ):
     review_service = ReviewService(db)
-    return await review_service.get_service_reviews(service_id, skip, limit)
+    selected = parse_fields(fields, ReviewResponse)
+    reviews, next_cursor = await review_service.get_service_reviews(service_id, cursor, limit, selected, skip)
+    if selected:
+        # Partial rows can't satisfy response_model; send them as they are
+        sparse = RowsJSONResponse(reviews)
+        set_next_cursor(sparse, next_cursor)
+        return sparse
+    set_next_cursor(response, next_cursor)
+    return reviews
 
 @router.patch("/{review_id}", response_model=ReviewResponse)
 async def update_review(
@@ -1,30 +1,96 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request
+import orjson
+from pydantic import TypeAdapter
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
+from datetime import datetime
 
-from app.database import get_db
+from app.config import settings
+from app.database import get_db, get_primary_read_db, get_read_db, UnitOfWorkRoute
 from app.auth.dependencies import get_current_active_user, require_admin
-from app.schemas.service import ServiceResponse, ServiceCreate, ServiceUpdate
-from app.services.service import ServiceService
+from app.schemas.service import (
+    ServiceResponse, ServiceCreate, ServiceUpdate, ServiceAvailability,
+    ServiceUpsert, ServiceBulkUpsertReport, ServiceRatingResponse,
+    TopServiceResponse,
+)
+from app.services.service import ServiceService, catalog_cache
+from app.utils.fieldsets import parse_fields
+from app.utils.pagination import clamp_limit, NEXT_CURSOR_HEADER
+from app.utils.serialization import ORJSON_OPTIONS
+from app.utils.statement_budget import statement_budget
 
-router = APIRouter(prefix="/services", tags=["services"])
+router = APIRouter(prefix="/services", tags=["services"], route_class=UnitOfWorkRoute)
+
+service_list_adapter = TypeAdapter(list[ServiceResponse])
+
+# Cached responses are shared by every user and outlive the read-your-writes window, so they
+# are rendered from the primary; the cache takes the catalog's read load off it instead
+get_catalog_db = get_primary_read_db if catalog_cache.enabled else get_read_db
 
 @router.get("/", response_model=list[ServiceResponse])
 async def get_services(
+    request: Request,
     q: Optional[str] = Query(None),
     price_min: Optional[float] = Query(None),
     price_max: Optional[float] = Query(None),
     active: bool = Query(True),
+    cursor: Optional[str] = Query(None),
+    limit: Optional[int] = Query(None, ge=1),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,title,price"),
+    db: AsyncSession = Depends(get_catalog_db)
+):
+    q = q.strip().lower() if q else None
+    limit = clamp_limit(limit)
+    selected = parse_fields(fields, ServiceResponse)
+
+    async def render():
+        service_service = ServiceService(db)
+        services, next_cursor = await service_service.search_services(q, price_min, price_max, active, cursor, limit, selected)
+        if selected:
+            body = orjson.dumps(services, option=ORJSON_OPTIONS)
+        else:
+            body = service_list_adapter.dump_json(
+                [ServiceResponse.model_validate(service) for service in services]
+            )
+        return body, {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else {}
+
+    key = ("list", q, price_min, price_max, active, cursor, limit, selected)
+    return await catalog_cache.respond(request, key, render)
+
+@router.get("/top", response_model=list[TopServiceResponse])
+async def get_top_services(
+    by: str = Query("rating", pattern="^(rating|bookings)$"),
+    window: int = Query(7, ge=1, description="Days of bookings to rank by; ignored for rating"),
+    limit: int = Query(10, ge=1, le=settings.LEADERBOARD_SIZE),
     db: AsyncSession = Depends(get_db)
 ):
     service_service = ServiceService(db)
-    return await service_service.search_services(q, price_min, price_max, active)
+    return await service_service.get_top_services(by, window, limit)
 
 @router.get("/{service_id}", response_model=ServiceResponse)
-async def get_service(service_id: int, db: AsyncSession = Depends(get_db)):
+async def get_service(service_id: int, request: Request, db: AsyncSession = Depends(get_catalog_db)):
+    async def render():
+        service_service = ServiceService(db)
+        service = await service_service.get_service(service_id)
+        return ServiceResponse.model_validate(service).model_dump_json().encode(), {}
+
+    return await catalog_cache.respond(request, ("detail", service_id), render)
+
+@router.get("/{service_id}/ratings", response_model=ServiceRatingResponse)
+async def get_service_ratings(service_id: int, db: AsyncSession = Depends(get_read_db)):
+    service_service = ServiceService(db)
+    return await service_service.get_ratings(service_id)
+
+@router.get("/{service_id}/availability", response_model=ServiceAvailability)
+async def get_service_availability(
+    service_id: int,
+    from_date: datetime = Query(..., alias="from"),
+    to_date: datetime = Query(..., alias="to"),
+    step: Optional[int] = Query(None, ge=1, le=1440, description="Slot grid in minutes, defaults to the service duration"),
+    db: AsyncSession = Depends(get_db)
+):
     service_service = ServiceService(db)
-    service = await service_service.get_service(service_id)
-    return service
+    return await service_service.get_availability(service_id, from_date, to_date, step)
 
 @router.post("/", response_model=ServiceResponse, status_code=201)
 async def create_service(
@@ -35,6 +101,19 @@ async def create_service(
     service_service = ServiceService(db)
     return await service_service.create_service(service_data)
 
+@router.put("/bulk", response_model=ServiceBulkUpsertReport)
+@statement_budget(None)  # one upsert per chunk, so it grows with the payload
+async def bulk_upsert_services(
+    services: list[ServiceUpsert],
+    db: AsyncSession = Depends(get_db),
+    admin_user = Depends(require_admin)
+):
+    """
+    Create or update services keyed by external_id (admin only).
+    """
+    service_service = ServiceService(db)
+    return await service_service.bulk_upsert_services(services)
+
 @router.patch("/{service_id}", response_model=ServiceResponse)
 async def update_service(
     service_id: int,
@@ -1,16 +1,20 @@
 from fastapi import APIRouter, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
+from app.database import get_db, UnitOfWorkRoute
 from app.auth.dependencies import get_current_active_user
 from app.schemas.user import UserResponse, UserUpdate
 from app.services.user import UserService
 
-router = APIRouter(prefix="/users", tags=["users"])
+router = APIRouter(prefix="/users", tags=["users"], route_class=UnitOfWorkRoute)
 
 @router.get("/me", response_model=UserResponse)
-async def get_current_user_profile(current_user = Depends(get_current_active_user)):
-    return current_user
+async def get_current_user_profile(
+    db: AsyncSession = Depends(get_db),
+    current_user = Depends(get_current_active_user)
+):
+    user_service = UserService(db)
+    return await user_service.get_user(current_user.id)
 
 @router.patch("/me", response_model=UserResponse)
 async def update_current_user_profile(
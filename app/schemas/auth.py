@@ -11,6 +11,15 @@ class TokenData(BaseModel):
     email: str
     role: str
 
+class Principal(BaseModel):
+    """The authenticated caller, as needed for authorization checks."""
+    id: int
+    email: str
+    role: UserRole
+
+    class Config:
+        from_attributes = True
+
 class RefreshToken(BaseModel):
     refresh_token: str
 
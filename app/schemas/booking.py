@@ -38,4 +38,21 @@ class BookingWithServiceResponse(BaseModel):
     service_duration: int
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class BookingBulkItem(BaseModel):
+    service_id: int
+    start_time: datetime
+    user_id: int | None = None
+    status: BookingStatus = BookingStatus.PENDING
+
+class BookingBulkResult(BaseModel):
+    row: int
+    status: str
+    booking_id: int | None = None
+    error: str | None = None
+
+class BookingBulkReport(BaseModel):
+    created: int
+    failed: int
+    results: list[BookingBulkResult]
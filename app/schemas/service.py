@@ -7,20 +7,56 @@ class ServiceBase(BaseModel):
     price: float
     duration_minutes: int
     is_active: bool = True
+    external_id: str | None = None
 
 class ServiceCreate(ServiceBase):
     pass
 
+class ServiceUpsert(ServiceBase):
+    external_id: str
+
+class ServiceBulkUpsertReport(BaseModel):
+    created: int
+    updated: int
+    unchanged: int
+
 class ServiceUpdate(BaseModel):
     title: str | None = None
     description: str | None = None
     price: float | None = None
     duration_minutes: int | None = None
     is_active: bool | None = None
+    external_id: str | None = None
 
 class ServiceResponse(ServiceBase):
     id: int
     created_at: datetime
+    avg_rating: float | None = None
+    review_count: int = 0
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class AvailabilitySlot(BaseModel):
+    start_time: datetime
+    end_time: datetime
+
+class ServiceAvailability(BaseModel):
+    service_id: int
+    from_date: datetime
+    to_date: datetime
+    duration_minutes: int
+    step_minutes: int
+    slots: list[AvailabilitySlot]
+
+class ServiceRatingResponse(BaseModel):
+    service_id: int
+    review_count: int
+    avg_rating: float | None
+    histogram: dict[int, int]
+
+class TopServiceResponse(BaseModel):
+    rank: int
+    service_id: int
+    title: str
+    score: float
@@ -1,14 +1,27 @@
+import logging
 from datetime import timedelta
 from fastapi import HTTPException, status
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.database import end_read
 from app.repositories.user import UserRepository
 from app.schemas.auth import UserLogin, UserRegister
-from app.utils.security import verify_password, get_password_hash
+from app.utils.security import verify_password_async, get_password_hash_async, PasswordHasherBusy
 from app.auth.jwt import create_access_token, create_refresh_token
 
+logger = logging.getLogger(__name__)
+
+def _hasher_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Authentication service is busy, please retry",
+        headers={"Retry-After": "1"},
+    )
+
 class AuthService:
     def __init__(self, db: AsyncSession):
+        self.db = db
         self.user_repo = UserRepository(db)
 
     async def register(self, user_data: UserRegister):
@@ -31,9 +44,14 @@ class AuthService:
                 detail="Email already registered"
             )
 
+        # Don't hold a pooled connection while waiting for a hasher worker
+        await end_read(self.db)
+
         # Hash password with error handling
         try:
-            hashed_password = get_password_hash(user_data.password)
+            hashed_password = await get_password_hash_async(user_data.password)
+        except PasswordHasherBusy:
+            raise _hasher_busy()
         except Exception as e:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -49,8 +67,16 @@ class AuthService:
         }
         
         try:
-            user = await self.user_repo.create(user_dict)
+            # Savepoint: a concurrent registration of the same email fails the
+            # unique constraint without aborting the request's transaction
+            async with self.db.begin_nested():
+                user = await self.user_repo.create(user_dict)
             return user
+        except IntegrityError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Email already registered"
+            )
         except Exception as e:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -69,11 +95,16 @@ class AuthService:
                 detail="Incorrect email or password"
             )
 
+        # Don't hold a pooled connection while waiting for a hasher worker
+        await end_read(self.db)
+
         # Verify password with error handling
         try:
-            password_valid = verify_password(credentials.password, user.password_hash)
-        except Exception as e:
-            print(f"Password verification error: {e}")
+            password_valid = await verify_password_async(credentials.password, user.password_hash)
+        except PasswordHasherBusy:
+            raise _hasher_busy()
+        except Exception:
+            logger.exception("Password verification error")
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Authentication error"
@@ -85,7 +116,10 @@ class AuthService:
                 detail="Incorrect email or password"
             )
 
-        # Create tokens
+        return self.issue_tokens(user)
+
+    def issue_tokens(self, user):
+        """Access and refresh tokens for an authenticated user"""
         token_data = {
             "user_id": user.id,
             "email": user.email,
@@ -1,18 +1,96 @@
-from datetime import timedelta
+import csv
+import io
+import json
+from datetime import datetime, timedelta
+from functools import partial
+from typing import AsyncIterable
 from fastapi import HTTPException, status
+from pydantic import ValidationError
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.repositories.booking import BookingRepository
+from app.repositories.booking import BookingRepository, ACTIVE_STATUSES, BOOKING_ROW_KEYS, is_overlap_violation
 from app.repositories.service import ServiceRepository
-from app.schemas.booking import BookingCreate, BookingUpdate, BookingWithServiceResponse
+from app.repositories.user import UserRepository
+from app.schemas.booking import (
+    BookingCreate, BookingUpdate, BookingWithServiceResponse,
+    BookingBulkItem, BookingBulkResult, BookingBulkReport,
+)
 from app.models.booking import BookingStatus
+from app.config import settings
+from app.database import on_commit, begin_write, rollback
+from app.utils.csv_stream import InvalidCSV, csv_records
+from app.utils.intervals import BookingIntervalIndex, Interval, ServiceIntervals, to_naive_utc
+
+# Process-wide index of active bookings, used to answer conflict checks without a range query
+booking_index = BookingIntervalIndex(ttl=settings.BOOKING_INDEX_TTL_SECONDS)
+
+class BookingConflict(HTTPException):
+    """409 for an overlapping booking; the handler in app.main adds ``conflicting_booking`` next to ``detail``"""
+
+    def __init__(self, message: str, conflict: Interval | None):
+        super().__init__(status_code=status.HTTP_409_CONFLICT, detail=message)
+        self.conflicting_booking = {
+            "id": conflict.booking_id,
+            "start_time": conflict.start_time.isoformat(),
+            "end_time": conflict.end_time.isoformat(),
+        } if conflict else None
+
+async def read_bulk_rows(content_type: str, chunks: AsyncIterable[bytes]) -> list:
+    """Read a bulk import body, a JSON array or a CSV streamed record by record, into a list of row dicts."""
+    too_many = HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"Bulk import is limited to {settings.BULK_MAX_ROWS} rows"
+    )
+
+    if content_type.startswith("text/csv"):
+        rows = []
+        header = None
+        try:
+            async for values in csv_records(chunks):
+                if header is None:
+                    header = [name.strip() for name in values]
+                    continue
+                if len(rows) >= settings.BULK_MAX_ROWS:
+                    raise too_many
+                rows.append({name: value for name, value in zip(header, values) if value != ""})
+        except InvalidCSV as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        return rows
+
+    try:
+        rows = json.loads(b"".join([chunk async for chunk in chunks]))
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Body must be a JSON array or CSV")
+    if not isinstance(rows, list):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Body must be a JSON array of bookings")
+    if len(rows) > settings.BULK_MAX_ROWS:
+        raise too_many
+    return rows
+
+def _first_error(error: ValidationError) -> str:
+    first = error.errors()[0]
+    location = ".".join(str(part) for part in first["loc"])
+    return f"{location}: {first['msg']}" if location else first["msg"]
+
+def _export_values(row) -> list:
+    return [
+        value.isoformat() if isinstance(value, datetime)
+        else value.value if isinstance(value, BookingStatus)
+        else value
+        for value in row
+    ]
 
 class BookingService:
     def __init__(self, db: AsyncSession):
+        self.db = db
         self.booking_repo = BookingRepository(db)
         self.service_repo = ServiceRepository(db)
+        self.user_repo = UserRepository(db)
 
     async def create_booking(self, user_id: int, booking_data: BookingCreate):
+        await begin_write(self.db)
+
         # Get service
         service = await self.service_repo.get_by_id(booking_data.service_id)
         if not service or not service.is_active:
@@ -25,23 +103,173 @@ class BookingService:
         end_time = booking_data.start_time + timedelta(minutes=service.duration_minutes)
 
         # Check for conflicts
-        has_conflict = await self.booking_repo.check_booking_conflict(
-            booking_data.service_id, booking_data.start_time, end_time
-        )
+        conflict = await self.find_conflict(booking_data.service_id, booking_data.start_time, end_time)
         
-        if has_conflict:
-            raise HTTPException(
-                status_code=status.HTTP_409_CONFLICT,
-                detail="Booking time conflicts with existing booking"
-            )
+        if conflict:
+            raise BookingConflict("Booking time conflicts with existing booking", conflict)
 
         # Create booking
         booking_dict = booking_data.dict()
         booking_dict["user_id"] = user_id
         booking_dict["end_time"] = end_time
         
-        booking = await self.booking_repo.create(booking_dict)
-        return booking
+        booking = await self._admit(
+            self.booking_repo.create(booking_dict),
+            booking_data.service_id, booking_data.start_time, end_time,
+            "Booking time conflicts with existing booking",
+        )
+        self._sync_index(booking)
+        return self._with_service(booking, service)
+
+    async def find_conflict(self, service_id: int, start_time, end_time, exclude_booking_id: int = None) -> Interval | None:
+        """Return the active booking overlapping [start_time, end_time), if any"""
+        if not settings.BOOKING_INDEX_ENABLED:
+            return await self._find_conflict_in_db(service_id, start_time, end_time, exclude_booking_id)
+
+        intervals = booking_index.get(service_id)
+        if intervals is None:
+            rows = await self.booking_repo.get_active_intervals(service_id)
+            intervals = booking_index.load(service_id, (Interval(*row) for row in rows))
+        conflict = intervals.find_overlap(start_time, end_time, exclude_booking_id)
+        if conflict is None and self.booking_repo.enforces_no_overlap:
+            return None
+        # The index trails commits made by other workers and connections, so the
+        # table has the final say: a hit may have been cancelled or moved since,
+        # and without the exclusion constraint a miss may have been booked since
+        confirmed = await self._find_conflict_in_db(service_id, start_time, end_time, exclude_booking_id)
+        if conflict and confirmed is None:
+            booking_index.invalidate(service_id)
+        return confirmed
+
+    async def _find_conflict_in_db(self, service_id: int, start_time, end_time, exclude_booking_id: int = None) -> Interval | None:
+        booking = await self.booking_repo.find_conflicting_booking(
+            service_id, start_time, end_time, exclude_booking_id
+        )
+        return Interval(booking.id, booking.start_time, booking.end_time) if booking else None
+
+    async def _admit(self, write, service_id: int, start_time, end_time, message: str, exclude_booking_id: int = None):
+        """
+        Await a booking insert/update. On PostgreSQL a concurrent admission of
+        an overlapping booking makes it fail the exclusion constraint, which
+        is reported as the usual 409 (and the stale index entry dropped).
+        """
+        try:
+            return await write
+        except IntegrityError as e:
+            if not is_overlap_violation(e):
+                raise
+            await rollback(self.db)
+            booking_index.invalidate(service_id)
+            conflict = await self._find_conflict_in_db(service_id, start_time, end_time, exclude_booking_id)
+            raise BookingConflict(message, conflict)
+
+    def _sync_index(self, booking):
+        """Mirror a written booking into the interval index once the request commits"""
+        if booking.status in ACTIVE_STATUSES:
+            interval = Interval(booking.id, booking.start_time, booking.end_time)
+            on_commit(self.db, partial(booking_index.add, booking.service_id, interval))
+        else:
+            on_commit(self.db, partial(booking_index.remove, booking.service_id, booking.id))
+
+    async def bulk_create_bookings(self, rows: list, default_user_id: int) -> BookingBulkReport:
+        """
+        Validate, conflict-check and insert a batch of bookings.
+
+        Services and users are resolved with one query each, and existing
+        bookings of the affected services with one window query. Conflicts
+        are found with an interval sweep over existing bookings plus the
+        rows accepted so far, so earlier rows win over later ones. Valid
+        rows are inserted in chunks and commit with the request.
+        """
+        await begin_write(self.db)
+
+        results: list[BookingBulkResult] = []
+        candidates = []
+        for row_number, raw in enumerate(rows, start=1):
+            try:
+                item = BookingBulkItem.model_validate(raw)
+            except ValidationError as e:
+                results.append(BookingBulkResult(row=row_number, status="error", error=_first_error(e)))
+                continue
+            candidates.append((row_number, item))
+
+        services = {
+            service.id: service
+            for service in await self.service_repo.get_by_ids({item.service_id for _, item in candidates})
+        }
+        user_ids = {item.user_id for _, item in candidates if item.user_id is not None}
+        known_users = {user.id for user in await self.user_repo.get_by_ids(user_ids)} if user_ids else set()
+
+        accepted = []
+        for row_number, item in candidates:
+            service = services.get(item.service_id)
+            if not service or not service.is_active:
+                results.append(BookingBulkResult(row=row_number, status="error", error="Service not found or inactive"))
+            elif item.user_id is not None and item.user_id not in known_users:
+                results.append(BookingBulkResult(row=row_number, status="error", error="User not found"))
+            else:
+                end_time = item.start_time + timedelta(minutes=service.duration_minutes)
+                accepted.append((row_number, item, end_time))
+
+        active = [entry for entry in accepted if entry[1].status in ACTIVE_STATUSES]
+        intervals_by_service: dict[int, ServiceIntervals] = {}
+        if active:
+            existing = await self.booking_repo.get_active_intervals_for_services(
+                {item.service_id for _, item, _ in active},
+                min(to_naive_utc(item.start_time) for _, item, _ in active),
+                max(to_naive_utc(end_time) for _, _, end_time in active),
+            )
+            for service_id, booking_id, start_time, end_time in existing:
+                intervals_by_service.setdefault(service_id, ServiceIntervals()).add(
+                    Interval(booking_id, start_time, end_time)
+                )
+
+        to_insert = []
+        for row_number, item, end_time in accepted:
+            if item.status in ACTIVE_STATUSES:
+                intervals = intervals_by_service.setdefault(item.service_id, ServiceIntervals())
+                conflict = intervals.find_overlap(item.start_time, end_time)
+                if conflict:
+                    # Rows of this batch are indexed under their negated row number
+                    error = (
+                        f"Conflicts with row {-conflict.booking_id}" if conflict.booking_id < 0
+                        else f"Conflicts with booking {conflict.booking_id}"
+                    )
+                    results.append(BookingBulkResult(row=row_number, status="error", error=error))
+                    continue
+                intervals.add(Interval(-row_number, item.start_time, end_time))
+
+            to_insert.append((row_number, {
+                "user_id": item.user_id if item.user_id is not None else default_user_id,
+                "service_id": item.service_id,
+                "start_time": item.start_time,
+                "end_time": end_time,
+                "status": item.status,
+            }))
+
+        if to_insert:
+            try:
+                booking_ids = await self.booking_repo.bulk_create(
+                    [values for _, values in to_insert], settings.BULK_INSERT_CHUNK_SIZE
+                )
+            except IntegrityError as e:
+                if not is_overlap_violation(e):
+                    raise
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail="Bookings were created concurrently for the same time slots; retry the import"
+                )
+            for (row_number, _), booking_id in zip(to_insert, booking_ids):
+                results.append(BookingBulkResult(row=row_number, status="created", booking_id=booking_id))
+            for service_id in {values["service_id"] for _, values in to_insert}:
+                on_commit(self.db, partial(booking_index.invalidate, service_id))
+
+        results.sort(key=lambda result: result.row)
+        return BookingBulkReport(
+            created=len(to_insert),
+            failed=len(results) - len(to_insert),
+            results=results,
+        )
 
     async def get_booking(self, booking_id: int):
         booking = await self.booking_repo.get_by_id(booking_id)
@@ -54,14 +282,38 @@ class BookingService:
 
     async def get_booking_with_service(self, booking_id: int):
         """Get booking with service details"""
+        booking, service = await self._get_booking_and_service(booking_id)
+        return self._with_service(booking, service)
+
+    async def _get_booking_and_service(self, booking_id: int):
         result = await self.booking_repo.get_booking_with_service(booking_id)
         if not result:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Booking not found"
             )
-        
-        booking, service = result
+        return result
+
+    async def get_user_bookings(self, user_id: int, status: str = None, from_date: datetime = None, to_date: datetime = None, cursor: str = None, limit: int = None, fields: tuple[str, ...] = None):
+        """
+        Get one page of a user's bookings with service details, as plain dicts
+        shaped like BookingWithServiceResponse (rendered with RowsJSONResponse),
+        holding only ``fields`` when given
+        """
+        rows, next_cursor = await self.booking_repo.get_user_bookings_with_services(
+            user_id, status, from_date, to_date, cursor, limit, fields
+        )
+        return [dict(zip(fields or BOOKING_ROW_KEYS, row)) for row in rows], next_cursor
+
+    async def get_all_bookings_with_filters(self, status: str = None, from_date: datetime = None, to_date: datetime = None, cursor: str = None, limit: int = None, fields: tuple[str, ...] = None):
+        """Get one page of all bookings with service details (for admin), as plain dicts"""
+        rows, next_cursor = await self.booking_repo.get_all_bookings_with_services(
+            status, from_date, to_date, cursor, limit, fields
+        )
+        return [dict(zip(fields or BOOKING_ROW_KEYS, row)) for row in rows], next_cursor
+
+    @staticmethod
+    def _with_service(booking, service) -> BookingWithServiceResponse:
         return BookingWithServiceResponse(
             id=booking.id,
             user_id=booking.user_id,
@@ -75,50 +327,36 @@ class BookingService:
             service_duration=service.duration_minutes
         )
 
-    async def get_user_bookings(self, user_id: int):
-        """Get user bookings with service details"""
-        results = await self.booking_repo.get_user_bookings_with_services(user_id)
-        bookings_with_services = []
-        
-        for booking, service in results:
-            bookings_with_services.append(BookingWithServiceResponse(
-                id=booking.id,
-                user_id=booking.user_id,
-                service_id=booking.service_id,
-                start_time=booking.start_time,
-                end_time=booking.end_time,
-                status=booking.status,
-                created_at=booking.created_at,
-                service_title=service.title,
-                service_price=service.price,
-                service_duration=service.duration_minutes
-            ))
-        
-        return bookings_with_services
+    async def export_bookings(self, export_format: str, status: str = None, from_date: datetime = None, to_date: datetime = None):
+        """
+        Yield bookings with service details as NDJSON or CSV text chunks, one
+        chunk per fetched batch, so memory stays flat regardless of row count.
+        """
+        columns = BOOKING_ROW_KEYS
+        batches = self.booking_repo.stream_bookings_with_services(
+            status, from_date, to_date, settings.EXPORT_BATCH_SIZE
+        )
 
-    async def get_all_bookings_with_filters(self, status: str = None, from_date: str = None, to_date: str = None):
-        """Get all bookings with service details (for admin)"""
-        results = await self.booking_repo.get_all_bookings_with_services(status, from_date, to_date)
-        bookings_with_services = []
-        
-        for booking, service in results:
-            bookings_with_services.append(BookingWithServiceResponse(
-                id=booking.id,
-                user_id=booking.user_id,
-                service_id=booking.service_id,
-                start_time=booking.start_time,
-                end_time=booking.end_time,
-                status=booking.status,
-                created_at=booking.created_at,
-                service_title=service.title,
-                service_price=service.price,
-                service_duration=service.duration_minutes
-            ))
-        
-        return bookings_with_services
+        if export_format == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(columns)
+            async for rows in batches:
+                writer.writerows(_export_values(row) for row in rows)
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+            if buffer.tell():
+                yield buffer.getvalue()
+        else:
+            async for rows in batches:
+                yield "".join(
+                    json.dumps(dict(zip(columns, _export_values(row)))) + "\n" for row in rows
+                )
 
     async def update_booking(self, booking_id: int, booking_update: BookingUpdate, current_user):
-        booking = await self.get_booking(booking_id)
+        await begin_write(self.db)
+        booking, service = await self._get_booking_and_service(booking_id)
         
         # Check permissions
         if current_user.role != "admin" and booking.user_id != current_user.id:
@@ -127,28 +365,34 @@ class BookingService:
                 detail="Not authorized to update this booking"
             )
 
+        start_time, end_time = booking.start_time, booking.end_time
+
         # If updating start_time, check for conflicts
         if booking_update.start_time:
-            service = await self.service_repo.get_by_id(booking.service_id)
             new_end_time = booking_update.start_time + timedelta(minutes=service.duration_minutes)
+            start_time, end_time = booking_update.start_time, new_end_time
             
-            has_conflict = await self.booking_repo.check_booking_conflict(
+            conflict = await self.find_conflict(
                 booking.service_id, booking_update.start_time, new_end_time, booking_id
             )
             
-            if has_conflict:
-                raise HTTPException(
-                    status_code=status.HTTP_409_CONFLICT,
-                    detail="New booking time conflicts with existing booking"
-                )
+            if conflict:
+                raise BookingConflict("New booking time conflicts with existing booking", conflict)
             
             booking_update_dict = booking_update.dict(exclude_unset=True)
             booking_update_dict["end_time"] = new_end_time
-            booking_update = BookingUpdate(**booking_update_dict)
+            booking_update = booking_update_dict
 
-        return await self.booking_repo.update(booking_id, booking_update)
+        updated_booking = await self._admit(
+            self.booking_repo.update(booking_id, booking_update),
+            booking.service_id, start_time, end_time,
+            "New booking time conflicts with existing booking", booking_id,
+        )
+        self._sync_index(updated_booking)
+        return self._with_service(updated_booking, service)
 
     async def cancel_booking(self, booking_id: int, user_id: int, is_admin: bool = False):
+        await begin_write(self.db)
         booking = await self.booking_repo.get_by_id(booking_id)
         if not booking:
             raise HTTPException(
@@ -174,5 +418,6 @@ class BookingService:
         updated_booking = await self.booking_repo.update(
             booking_id, {"status": BookingStatus.CANCELLED}
         )
+        self._sync_index(updated_booking)
         
         return updated_booking
\ No newline at end of file
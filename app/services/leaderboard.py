@@ -0,0 +1,164 @@
+import asyncio
+import heapq
+import logging
+from collections import Counter
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.booking import BookingStatus
+from app.repositories.booking import BookingRepository
+from app.repositories.rating import RatingStatsRepository
+from app.repositories.service import ServiceRepository
+from app.schemas.service import TopServiceResponse
+from app.utils.intervals import to_naive_utc
+
+logger = logging.getLogger(__name__)
+
+
+def _as_date(value) -> date:
+    # SQLite's date() returns text, PostgreSQL a date
+    return date.fromisoformat(value) if isinstance(value, str) else value
+
+
+class Leaderboard:
+    """
+    Precomputed "top services" rankings, by average rating and by bookings
+    created in the last N days.
+
+    Booking counts are kept as per-day counters. A full recompute (one
+    grouped query) seeds them, and every ``recompute_seconds`` recomputes
+    them to pick up later cancellations. In between, each refresh folds in
+    only the bookings created since a ``created_at`` horizon, at most
+    ``batch_size`` new rows, so a refresh costs a bounded amount regardless
+    of table size. The horizon trails the newest booking seen by ``overlap``,
+    because ids and timestamps are assigned before commit and bookings can
+    become visible out of order; rows re-read from the overlap are recognised
+    by id. Rating rankings come from the service_rating_stats aggregates.
+    Reads slice a ready list, so serving the top k is O(k).
+    """
+
+    def __init__(self, windows_days: list[int], size: int, min_reviews: int, batch_size: int,
+                 overlap: timedelta = timedelta(minutes=1), recompute_seconds: float = 3600):
+        self.windows_days = sorted(windows_days)
+        self.size = size
+        self.min_reviews = min_reviews
+        self.batch_size = batch_size
+        self.overlap = overlap
+        self.recompute_seconds = recompute_seconds
+        self.refreshed_at: datetime | None = None
+        self._rankings: dict[tuple[str, int | None], list[TopServiceResponse]] = {}
+        self._daily: dict[date, Counter] = {}
+        # Bookings created before the horizon are counted; _recent holds the ids counted at or after it
+        self._horizon: datetime | None = None
+        self._recent: dict[int, datetime] = {}
+        self._recomputed_at: datetime | None = None
+        self._lock: asyncio.Lock | None = None
+        self._lock_loop: asyncio.AbstractEventLoop | None = None
+
+    def top(self, by: str, window_days: int | None, k: int) -> list[TopServiceResponse]:
+        return self._rankings.get((by, window_days if by == "bookings" else None), [])[:k]
+
+    def _get_lock(self) -> asyncio.Lock:
+        # asyncio locks belong to one event loop; the app may be started more than once per process
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._lock_loop is not loop:
+            self._lock, self._lock_loop = asyncio.Lock(), loop
+        return self._lock
+
+    async def refresh(self, db: AsyncSession):
+        async with self._get_lock():
+            booking_repo = BookingRepository(db)
+            now = datetime.now(timezone.utc)
+            today = now.date()
+            oldest_day = today - timedelta(days=self.windows_days[-1] - 1)
+
+            if self._horizon is None or now - self._recomputed_at >= timedelta(seconds=self.recompute_seconds):
+                # Full recompute: one grouped query over the longest window, up to the horizon
+                self._horizon, self._recent, self._daily = now - self.overlap, {}, {}
+                since = datetime.combine(oldest_day, datetime.min.time(), tzinfo=timezone.utc)
+                for service_id, day, count in await booking_repo.count_created_by_day(since, self._horizon):
+                    self._daily.setdefault(_as_date(day), Counter())[service_id] += count
+                self._recomputed_at = now
+            else:
+                # Rows already counted come back too; fetch enough to still see batch_size new ones
+                rows = await booking_repo.get_created_since(self._horizon, self.batch_size + len(self._recent))
+                newest = None
+                for booking_id, service_id, created_at, status in rows:
+                    if created_at is None or booking_id in self._recent:
+                        continue
+                    created_at = to_naive_utc(created_at).replace(tzinfo=timezone.utc)
+                    self._recent[booking_id] = created_at
+                    newest = created_at if newest is None else max(newest, created_at)
+                    if status != BookingStatus.CANCELLED:
+                        self._daily.setdefault(created_at.date(), Counter())[service_id] += 1
+                if newest is not None and newest - self.overlap > self._horizon:
+                    self._horizon = newest - self.overlap
+                    self._recent = {
+                        booking_id: created_at
+                        for booking_id, created_at in self._recent.items() if created_at >= self._horizon
+                    }
+
+            for day in [day for day in self._daily if day < oldest_day]:
+                del self._daily[day]
+
+            rankings = {}
+            for window in self.windows_days:
+                first_day = today - timedelta(days=window - 1)
+                totals = Counter()
+                for day, counts in self._daily.items():
+                    if day >= first_day:
+                        totals.update(counts)
+                rankings[("bookings", window)] = heapq.nlargest(
+                    self.size, totals.items(), key=lambda item: (item[1], -item[0])
+                )
+
+            service_ids = {service_id for ranked in rankings.values() for service_id, _ in ranked}
+            services = {
+                service.id: service
+                for service in await ServiceRepository(db).get_by_ids(service_ids)
+                if service.is_active
+            }
+
+            self._rankings = {
+                key: self._ranked([
+                    (service_id, services[service_id].title, count)
+                    for service_id, count in ranked if service_id in services
+                ])
+                for key, ranked in rankings.items()
+            }
+            top_rated = await RatingStatsRepository(db).top_rated(self.size, self.min_reviews)
+            self._rankings[("rating", None)] = self._ranked(
+                [(service_id, title, avg_rating) for service_id, title, avg_rating, _ in top_rated]
+            )
+            self.refreshed_at = datetime.now(timezone.utc)
+
+    @staticmethod
+    def _ranked(rows) -> list[TopServiceResponse]:
+        return [
+            TopServiceResponse(rank=rank, service_id=service_id, title=title, score=score)
+            for rank, (service_id, title, score) in enumerate(rows, start=1)
+        ]
+
+    async def run_periodically(self, session_factory, interval: float):
+        """Refresh forever; meant to run as a background task for the app's lifetime"""
+        while True:
+            try:
+                async with session_factory() as session:
+                    await self.refresh(session)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Leaderboard refresh failed")
+            await asyncio.sleep(interval)
+
+
+leaderboard = Leaderboard(
+    windows_days=[int(days) for days in settings.LEADERBOARD_WINDOWS_DAYS.split(",")],
+    size=settings.LEADERBOARD_SIZE,
+    min_reviews=settings.LEADERBOARD_MIN_REVIEWS,
+    batch_size=settings.LEADERBOARD_REFRESH_BATCH,
+    overlap=timedelta(seconds=settings.LEADERBOARD_OVERLAP_SECONDS),
+    recompute_seconds=settings.LEADERBOARD_RECOMPUTE_SECONDS,
+)
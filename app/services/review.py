@@ -1,15 +1,21 @@
 from fastapi import HTTPException, status
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.repositories.review import ReviewRepository
 from app.repositories.booking import BookingRepository
+from app.repositories.rating import RatingStatsRepository
 from app.schemas.review import ReviewCreate, ReviewUpdate
 from app.models.booking import BookingStatus
+from app.database import on_commit
+from app.services.service import catalog_cache
 
 class ReviewService:
     def __init__(self, db: AsyncSession):
+        self.db = db
         self.review_repo = ReviewRepository(db)
         self.booking_repo = BookingRepository(db)
+        self.rating_repo = RatingStatsRepository(db)
 
     async def create_review(self, user_id: int, review_data: ReviewCreate):
         # Get booking
@@ -42,13 +48,25 @@ class ReviewService:
                 detail="Review already exists for this booking"
             )
 
-        return await self.review_repo.create(review_data)
+        # A concurrent review of the same booking fails the unique constraint;
+        # the savepoint undoes the aggregate update along with it
+        try:
+            async with self.db.begin_nested():
+                await self.rating_repo.apply(booking.service_id, added=review_data.rating)
+                review = await self.review_repo.create(review_data)
+        except IntegrityError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Review already exists for this booking"
+            )
+        on_commit(self.db, catalog_cache.bump)
+        return review
 
-    async def get_service_reviews(self, service_id: int, skip: int = 0, limit: int = 100):
-        return await self.review_repo.get_service_reviews(service_id, skip, limit)
+    async def get_service_reviews(self, service_id: int, cursor: str = None, limit: int = None, fields: tuple[str, ...] = None, skip: int = 0):
+        return await self.review_repo.get_service_reviews(service_id, cursor, limit, fields, skip)
 
     async def update_review(self, review_id: int, user_id: int, review_update: ReviewUpdate):
-        review = await self.review_repo.get_by_id(review_id)
+        review = await self.review_repo.get_with_booking(review_id)
         if not review:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -56,17 +74,21 @@ class ReviewService:
             )
 
         # Check if user owns the review
-        booking = await self.booking_repo.get_by_id(review.booking_id)
+        booking = review.booking
         if booking.user_id != user_id:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Not authorized to update this review"
             )
 
-        return await self.review_repo.update(review_id, review_update)
+        if review_update.rating is not None and review_update.rating != review.rating:
+            await self.rating_repo.apply(booking.service_id, added=review_update.rating, removed=review.rating)
+        updated_review = await self.review_repo.update(review_id, review_update)
+        on_commit(self.db, catalog_cache.bump)
+        return updated_review
 
     async def delete_review(self, review_id: int, user_id: int, is_admin: bool = False):
-        review = await self.review_repo.get_by_id(review_id)
+        review = await self.review_repo.get_with_booking(review_id)
         if not review:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -74,12 +96,14 @@ class ReviewService:
             )
 
         # Check permissions
-        booking = await self.booking_repo.get_by_id(review.booking_id)
+        booking = review.booking
         if not is_admin and booking.user_id != user_id:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Not authorized to delete this review"
             )
 
+        await self.rating_repo.apply(booking.service_id, removed=review.rating)
         await self.review_repo.delete(review_id)
+        on_commit(self.db, catalog_cache.bump)
         return True
\ No newline at end of file
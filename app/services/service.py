@@ -1,12 +1,33 @@
+from datetime import datetime, timedelta
 from fastapi import HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import settings
+from app.database import on_commit
+from app.repositories.booking import BookingRepository
 from app.repositories.service import ServiceRepository
-from app.schemas.service import ServiceCreate, ServiceUpdate
+from app.repositories.rating import RatingStatsRepository
+from app.schemas.service import (
+    ServiceCreate, ServiceUpdate, ServiceAvailability, AvailabilitySlot,
+    ServiceUpsert, ServiceBulkUpsertReport, ServiceRatingResponse, TopServiceResponse,
+)
+from app.utils.intervals import free_slots, to_utc
+from app.utils.response_cache import ResponseCache
+from app.services.leaderboard import leaderboard
+
+# Serialized GET /services responses; bumped when a catalog write commits
+catalog_cache = ResponseCache(
+    enabled=settings.CATALOG_CACHE_ENABLED,
+    maxsize=settings.CATALOG_CACHE_SIZE,
+    ttl=settings.CATALOG_CACHE_TTL_SECONDS,
+)
 
 class ServiceService:
     def __init__(self, db: AsyncSession):
+        self.db = db
         self.service_repo = ServiceRepository(db)
+        self.booking_repo = BookingRepository(db)
+        self.rating_repo = RatingStatsRepository(db)
 
     async def get_service(self, service_id: int):
         service = await self.service_repo.get_by_id(service_id)
@@ -17,17 +38,105 @@ class ServiceService:
             )
         return service
 
-    async def search_services(self, query: str = None, min_price: float = None, max_price: float = None, active: bool = True):
-        return await self.service_repo.search_services(query, min_price, max_price, active)
+    async def get_top_services(self, by: str, window_days: int, limit: int) -> list[TopServiceResponse]:
+        if by == "bookings" and window_days not in leaderboard.windows_days:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"window must be one of {leaderboard.windows_days}"
+            )
+        if leaderboard.refreshed_at is None:
+            await leaderboard.refresh(self.service_repo.db)
+        return leaderboard.top(by, window_days, limit)
+
+    async def get_ratings(self, service_id: int) -> ServiceRatingResponse:
+        await self.get_service(service_id)
+        stats = await self.rating_repo.get(service_id)
+        return ServiceRatingResponse(
+            service_id=service_id,
+            review_count=stats.review_count if stats else 0,
+            avg_rating=stats.avg_rating if stats else None,
+            histogram=stats.histogram if stats else dict.fromkeys(range(1, 6), 0),
+        )
+
+    async def get_availability(self, service_id: int, from_date: datetime, to_date: datetime, step_minutes: int | None = None):
+        """Free booking slots of a service between from_date and to_date"""
+        # Either bound may carry an offset or not; naive ones are UTC
+        from_date, to_date = to_utc(from_date), to_utc(to_date)
+        if to_date <= from_date:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="'to' must be after 'from'"
+            )
+        if to_date - from_date > timedelta(days=settings.AVAILABILITY_MAX_DAYS):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Availability window cannot exceed {settings.AVAILABILITY_MAX_DAYS} days"
+            )
+
+        service = await self.get_service(service_id)
+        if not service.is_active:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Service not found or inactive"
+            )
+
+        step_minutes = step_minutes or service.duration_minutes
+        # Query in UTC: SQLite compares the stored wall-clock times and would drop the offset
+        busy = await self.booking_repo.get_active_intervals_in_window(service_id, from_date, to_date)
+        slots = free_slots(
+            busy,
+            from_date,
+            to_date,
+            timedelta(minutes=service.duration_minutes),
+            timedelta(minutes=step_minutes),
+        )
+
+        return ServiceAvailability(
+            service_id=service_id,
+            from_date=from_date,
+            to_date=to_date,
+            duration_minutes=service.duration_minutes,
+            step_minutes=step_minutes,
+            slots=[AvailabilitySlot(start_time=start, end_time=end) for start, end in slots],
+        )
+
+    async def search_services(self, query: str = None, min_price: float = None, max_price: float = None, active: bool = True, cursor: str = None, limit: int = None, fields: tuple[str, ...] = None):
+        return await self.service_repo.search_services(
+            query, min_price, max_price, active, cursor, limit, fields, settings.SEARCH_MAX_RESULTS
+        )
 
     async def create_service(self, service_data: ServiceCreate):
-        return await self.service_repo.create(service_data)
+        service = await self.service_repo.create(service_data)
+        on_commit(self.db, catalog_cache.bump)
+        return service
+
+    async def bulk_upsert_services(self, items: list[ServiceUpsert]) -> ServiceBulkUpsertReport:
+        if len(items) > settings.BULK_MAX_ROWS:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"Bulk upsert is limited to {settings.BULK_MAX_ROWS} rows"
+            )
+        seen, repeated = set(), set()
+        for item in items:
+            (repeated if item.external_id in seen else seen).add(item.external_id)
+        if repeated:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Duplicate external_id values in payload: {', '.join(sorted(repeated))}"
+            )
+        counts = await self.service_repo.bulk_upsert(items, settings.BULK_INSERT_CHUNK_SIZE)
+        if counts["created"] or counts["updated"]:
+            on_commit(self.db, catalog_cache.bump)
+        return ServiceBulkUpsertReport(**counts)
 
     async def update_service(self, service_id: int, service_update: ServiceUpdate):
         service = await self.get_service(service_id)
-        return await self.service_repo.update(service_id, service_update)
+        service = await self.service_repo.update(service_id, service_update)
+        on_commit(self.db, catalog_cache.bump)
+        return service
 
     async def delete_service(self, service_id: int):
         service = await self.get_service(service_id)
         await self.service_repo.delete(service_id)
+        on_commit(self.db, catalog_cache.bump)
         return True
\ No newline at end of file
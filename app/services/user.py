@@ -1,19 +1,41 @@
+from functools import partial
 from fastapi import HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.database import on_commit
 from app.repositories.user import UserRepository
 from app.schemas.user import UserUpdate
-from app.utils.security import get_password_hash
+from app.auth.cache import invalidate_principal
+from app.utils.security import get_password_hash_async, PasswordHasherBusy
 
 class UserService:
     def __init__(self, db: AsyncSession):
+        self.db = db
         self.user_repo = UserRepository(db)
 
+    async def get_user(self, user_id: int):
+        user = await self.user_repo.get_by_id(user_id)
+        if not user:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="User not found"
+            )
+        return user
+
     async def update_user(self, user_id: int, user_update: UserUpdate):
         update_data = user_update.dict(exclude_unset=True)
         
         # Hash password if it's being updated
         if 'password' in update_data:
-            update_data['password_hash'] = get_password_hash(update_data.pop('password'))
+            try:
+                update_data['password_hash'] = await get_password_hash_async(update_data.pop('password'))
+            except PasswordHasherBusy:
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Password service is busy, please retry",
+                    headers={"Retry-After": "1"},
+                )
         
-        return await self.user_repo.update(user_id, update_data)
\ No newline at end of file
+        user = await self.user_repo.update(user_id, update_data)
+        on_commit(self.db, partial(invalidate_principal, user_id))
+        return user
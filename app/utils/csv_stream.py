@@ -0,0 +1,59 @@
+"""
+CSV records from a streamed request body.
+
+Chunks are decoded with an incremental UTF-8 decoder, so a multibyte
+character split across two chunks is decoded once both halves arrived.
+Lines are fed to a single csv.reader a whole record at a time: a record
+ends at the first newline outside a quoted field, so quoted values may
+contain newlines.
+"""
+import codecs
+import csv
+from collections import deque
+from typing import AsyncIterable, AsyncIterator
+
+
+class InvalidCSV(ValueError):
+    """Raised when a CSV body is not valid UTF-8 or not parseable."""
+
+
+async def _lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[str]:
+    """Decoded lines, each keeping its trailing newline"""
+    # utf-8-sig also drops the byte order mark spreadsheet exports start with
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    try:
+        async for chunk in chunks:
+            pending += decoder.decode(chunk)
+            *complete, pending = pending.split("\n")
+            for line in complete:
+                yield line + "\n"
+        pending += decoder.decode(b"", final=True)
+    except UnicodeDecodeError as e:
+        raise InvalidCSV("CSV body must be UTF-8") from e
+    if pending:
+        yield pending
+
+
+async def csv_records(chunks: AsyncIterable[bytes]) -> AsyncIterator[list[str]]:
+    """Parse a streamed CSV body into records; blank lines are skipped"""
+    queued: deque[str] = deque()
+    reader = csv.reader(iter(queued.popleft, None))
+    record_lines = []
+    quotes = 0
+    async for line in _lines(chunks):
+        record_lines.append(line)
+        # Quotes inside quoted fields are doubled, so an odd count means the record continues
+        quotes += line.count('"')
+        if quotes % 2:
+            continue
+        queued.extend(record_lines)
+        record_lines, quotes = [], 0
+        try:
+            values = next(reader)
+        except csv.Error as e:
+            raise InvalidCSV(f"Malformed CSV: {e}") from e
+        if any(value.strip() for value in values):
+            yield values
+    if record_lines:
+        raise InvalidCSV("Malformed CSV: unterminated quoted field")
@@ -0,0 +1,27 @@
+"""
+Sparse fieldsets: ``?fields=id,start_time,status`` on list endpoints.
+
+Requested names are checked against the endpoint's response schema; the
+repositories then select only the matching columns, so unrequested columns
+are never fetched, hydrated or serialized.
+"""
+from pydantic import BaseModel
+
+
+class InvalidFields(ValueError):
+    """Raised when ?fields= names something the response schema doesn't have."""
+
+
+def parse_fields(fields: str | None, schema: type[BaseModel]) -> tuple[str, ...] | None:
+    """Return the requested field names in schema order, or None when all fields are wanted."""
+    if fields is None:
+        return None
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    if not requested:
+        raise InvalidFields("fields must name at least one field")
+    unknown = requested - schema.model_fields.keys()
+    if unknown:
+        raise InvalidFields(
+            f"Unknown fields: {', '.join(sorted(unknown))}. Allowed: {', '.join(schema.model_fields)}"
+        )
+    return tuple(name for name in schema.model_fields if name in requested)
@@ -0,0 +1,159 @@
+import time
+from bisect import bisect_left, insort
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, NamedTuple
+
+
+class Interval(NamedTuple):
+    booking_id: int
+    start_time: datetime
+    end_time: datetime
+
+
+def to_naive_utc(value: datetime) -> datetime:
+    """Compare everything as naive UTC; SQLite hands back naive datetimes, PostgreSQL aware ones."""
+    if value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def to_utc(value: datetime) -> datetime:
+    """Aware UTC; naive datetimes are taken as UTC. Aware bounds bind the same on SQLite and asyncpg."""
+    return to_naive_utc(value).replace(tzinfo=timezone.utc)
+
+
+class ServiceIntervals:
+    """
+    Active bookings of one service, kept sorted by start time.
+
+    Overlap queries bisect on the start time and only walk back over entries
+    that started less than the longest known booking length ago, so they cost
+    O(log n + k) for k neighbouring bookings.
+    """
+
+    def __init__(self, intervals: Iterable[Interval] = ()):
+        self._entries: list[tuple[datetime, int, datetime]] = []
+        self._by_id: dict[int, tuple[datetime, int, datetime]] = {}
+        self._max_length = timedelta(0)
+        for interval in intervals:
+            self.add(interval)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, interval: Interval):
+        self.remove(interval.booking_id)
+        entry = (to_naive_utc(interval.start_time), interval.booking_id, to_naive_utc(interval.end_time))
+        insort(self._entries, entry)
+        self._by_id[interval.booking_id] = entry
+        self._max_length = max(self._max_length, entry[2] - entry[0])
+
+    def remove(self, booking_id: int):
+        entry = self._by_id.pop(booking_id, None)
+        if entry is not None:
+            index = bisect_left(self._entries, entry)
+            del self._entries[index]
+
+    def find_overlap(self, start_time: datetime, end_time: datetime, exclude_booking_id: int = None) -> Interval | None:
+        start_time, end_time = to_naive_utc(start_time), to_naive_utc(end_time)
+        earliest_start = start_time - self._max_length
+
+        index = bisect_left(self._entries, (end_time,)) - 1
+        while index >= 0:
+            entry_start, booking_id, entry_end = self._entries[index]
+            if entry_start < earliest_start:
+                break
+            if entry_end > start_time and booking_id != exclude_booking_id:
+                return Interval(booking_id, entry_start, entry_end)
+            index -= 1
+        return None
+
+
+class BookingIntervalIndex:
+    """
+    Per-service interval index of pending/confirmed bookings.
+
+    The database stays the source of truth: a service is loaded on first use,
+    reloaded once it is older than ``ttl`` seconds (which bounds drift from
+    writes made by other workers), and can be dropped with ``invalidate``.
+    """
+
+    def __init__(self, ttl: float = 300.0):
+        self.ttl = ttl
+        self._services: dict[int, tuple[float, ServiceIntervals]] = {}
+
+    def get(self, service_id: int) -> ServiceIntervals | None:
+        entry = self._services.get(service_id)
+        if entry is None:
+            return None
+        loaded_at, intervals = entry
+        if time.monotonic() - loaded_at > self.ttl:
+            del self._services[service_id]
+            return None
+        return intervals
+
+    def load(self, service_id: int, intervals: Iterable[Interval]) -> ServiceIntervals:
+        service_intervals = ServiceIntervals(intervals)
+        self._services[service_id] = (time.monotonic(), service_intervals)
+        return service_intervals
+
+    def add(self, service_id: int, interval: Interval):
+        intervals = self.get(service_id)
+        if intervals is not None:
+            intervals.add(interval)
+
+    def remove(self, service_id: int, booking_id: int):
+        intervals = self.get(service_id)
+        if intervals is not None:
+            intervals.remove(booking_id)
+
+    def invalidate(self, service_id: int):
+        self._services.pop(service_id, None)
+
+    def clear(self):
+        self._services.clear()
+
+
+def free_slots(
+    busy: Iterable[tuple[datetime, datetime]],
+    window_start: datetime,
+    window_end: datetime,
+    duration: timedelta,
+    step: timedelta,
+) -> list[tuple[datetime, datetime]]:
+    """
+    Return every [start, start + duration) slot inside the window, on a ``step``
+    grid from ``window_start``, that does not overlap a busy interval.
+
+    ``busy`` must be sorted by start time. It is merged into disjoint blocks and
+    swept once alongside the candidate slots, so the cost is linear in the
+    number of bookings plus slots. Naive inputs are taken as UTC; slots are
+    returned as aware UTC datetimes.
+    """
+    window_start, window_end = to_naive_utc(window_start), to_naive_utc(window_end)
+
+    blocks: list[list[datetime]] = []
+    for start, end in busy:
+        start, end = to_naive_utc(start), to_naive_utc(end)
+        if blocks and start <= blocks[-1][1]:
+            blocks[-1][1] = max(blocks[-1][1], end)
+        else:
+            blocks.append([start, end])
+
+    slots = []
+    candidate = window_start
+    block_index = 0
+    while candidate + duration <= window_end:
+        slot_end = candidate + duration
+        while block_index < len(blocks) and blocks[block_index][1] <= candidate:
+            block_index += 1
+
+        if block_index < len(blocks) and blocks[block_index][0] < slot_end:
+            # Jump to the first grid point at or after the end of the blocking interval
+            steps = -(-(blocks[block_index][1] - candidate) // step)
+            candidate += steps * step
+            continue
+
+        slots.append((candidate.replace(tzinfo=timezone.utc), slot_end.replace(tzinfo=timezone.utc)))
+        candidate += step
+    return slots
@@ -0,0 +1,25 @@
+"""
+Readiness.
+
+``lifecycle.ready`` is set by the app's lifespan once warmup is done and
+cleared when the lifespan shuts down; /ready reports it. Waiting for
+in-flight requests on shutdown is left to uvicorn: it stops accepting
+connections on SIGTERM and runs the lifespan shutdown only once the open
+requests finished or ``--timeout-graceful-shutdown`` expired.
+"""
+
+
+class Lifecycle:
+    def __init__(self):
+        self.ready = False
+        self.stopping = False
+        self.startup_seconds: float | None = None
+
+    @property
+    def state(self) -> str:
+        if self.stopping:
+            return "stopping"
+        return "ready" if self.ready else "starting"
+
+
+lifecycle = Lifecycle()
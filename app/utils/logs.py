@@ -0,0 +1,137 @@
+"""
+Logging pipeline that keeps formatting and I/O off the event loop.
+
+configure_logging() routes every record through a QueueHandler; the only work
+done on the calling thread is tagging the record with the current request id
+and putting it on a queue. A QueueListener thread formats the records (JSON
+lines by default) and writes them to stdout. RequestIdMiddleware assigns each
+HTTP request its id, taken from an incoming X-Request-ID header when present
+and echoed back on the response.
+"""
+import logging
+import queue
+import sys
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+import orjson
+from starlette.datastructures import MutableHeaders
+
+REQUEST_ID_HEADER = "X-Request-ID"
+MAX_REQUEST_ID_LENGTH = 128
+
+request_id: ContextVar[str | None] = ContextVar("request_id", default=None)
+
+# LogRecord attributes that are not ``extra=`` fields
+_RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+_listener: QueueListener | None = None
+_listening = False
+
+
+class RequestIdFilter(logging.Filter):
+    """Stamp records with the request id while still on the logging thread"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id.get()
+        return True
+
+
+class DeferredQueueHandler(QueueHandler):
+    """QueueHandler that leaves formatting (message, traceback) to the listener thread"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line, with any ``extra=`` fields as top-level keys"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return orjson.dumps(entry, default=str).decode()
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s")
+
+
+def configure_logging(level: str = "INFO", fmt: str = "json"):
+    """Install the queue handler on the root logger and start the writer thread (again, after shutdown_logging)"""
+    global _listener, _listening
+    if _listener is not None:
+        if not _listening:
+            _listener.start()
+            _listening = True
+        return
+
+    stream = logging.StreamHandler(sys.stdout)
+    stream.setFormatter(JSONFormatter() if fmt == "json" else TextFormatter())
+    records = queue.SimpleQueue()
+    handler = DeferredQueueHandler(records)
+    handler.addFilter(RequestIdFilter())
+
+    logging.basicConfig(level=level.upper(), handlers=[handler], force=True)
+    # Send uvicorn's own loggers through the same pipeline instead of their direct stream handlers
+    for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
+        logging.getLogger(name).handlers.clear()
+        logging.getLogger(name).propagate = True
+
+    _listener = QueueListener(records, stream, respect_handler_level=True)
+    _listener.start()
+    _listening = True
+
+
+def shutdown_logging():
+    """Flush queued records and stop the writer thread"""
+    global _listening
+    if _listening:
+        _listener.stop()
+        _listening = False
+
+
+def _incoming_request_id(scope) -> str | None:
+    for name, value in scope["headers"]:
+        if name == b"x-request-id":
+            candidate = value.decode("latin-1")
+            if 0 < len(candidate) <= MAX_REQUEST_ID_LENGTH and candidate.isprintable():
+                return candidate
+    return None
+
+
+class RequestIdMiddleware:
+    """Pure ASGI middleware giving every HTTP request an id for its log records and response"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        current = _incoming_request_id(scope) or uuid.uuid4().hex
+        token = request_id.set(current)
+
+        async def send_with_request_id(message):
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append(REQUEST_ID_HEADER, current)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            request_id.reset(token)
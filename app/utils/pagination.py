@@ -0,0 +1,53 @@
+import base64
+import json
+from datetime import datetime
+
+from app.config import settings
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class InvalidCursor(ValueError):
+    """Raised when a client sends a cursor that was not produced by encode_cursor."""
+
+
+def clamp_limit(limit: int | None) -> int:
+    if limit is None:
+        return settings.DEFAULT_PAGE_SIZE
+    return max(1, min(limit, settings.MAX_PAGE_SIZE))
+
+
+def encode_cursor(*values) -> str:
+    """Encode the sort key of the last row of a page into an opaque token."""
+    payload = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_value(value, expected: type):
+    if expected is datetime:
+        if not isinstance(value, str):
+            raise TypeError(value)
+        return datetime.fromisoformat(value)
+    allowed = int if expected is int else (int, float)
+    if isinstance(value, bool) or not isinstance(value, allowed):
+        raise TypeError(value)
+    return value
+
+
+def decode_cursor(cursor: str, types: tuple[type, ...]) -> tuple:
+    """Decode a cursor into a sort key, which must have one value of each of ``types`` (datetime, int or float)."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        if not isinstance(payload, list) or len(payload) != len(types):
+            raise ValueError(cursor)
+        return tuple(_decode_value(value, expected) for value, expected in zip(payload, types))
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor("Invalid pagination cursor") from e
+
+
+def set_next_cursor(response, next_cursor: str | None):
+    """Expose the next page's cursor to the client; absent on the last page."""
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
@@ -0,0 +1,70 @@
+import hashlib
+from typing import Awaitable, Callable, Hashable, NamedTuple
+
+from fastapi import Request, Response, status
+
+from app.utils.cache import TTLCache
+
+
+class CachedResponse(NamedTuple):
+    body: bytes
+    etag: str
+    headers: dict
+
+
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [candidate.strip() for candidate in header.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+class ResponseCache:
+    """
+    In-process cache of serialized JSON responses.
+
+    Every key is combined with a version counter; ``bump`` moves to a new
+    version and drops all entries, so writers invalidate everything they may
+    have affected with a single call. Other worker processes only notice a
+    bump once their entries hit the TTL.
+    """
+
+    def __init__(self, enabled: bool = True, maxsize: int = 1024, ttl: float = 60.0):
+        self.enabled = enabled
+        self.version = 0
+        self._entries = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def bump(self):
+        self.version += 1
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        return {"version": self.version, **self._entries.stats()}
+
+    async def respond(
+        self,
+        request: Request,
+        key: Hashable,
+        render: Callable[[], Awaitable[tuple[bytes, dict]]],
+    ) -> Response:
+        """
+        Serve ``key`` from the cache, rendering it with ``render`` on a miss.
+        Responses carry a strong ETag, and a matching If-None-Match gets a 304.
+        """
+        versioned_key = (self.version, key)
+        cached = self._entries.get(versioned_key) if self.enabled else None
+        if cached is None:
+            body, headers = await render()
+            cached = CachedResponse(body, make_etag(body), headers)
+            if self.enabled:
+                self._entries.set(versioned_key, cached)
+
+        headers = {**cached.headers, "ETag": cached.etag}
+        if etag_matches(request, cached.etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return Response(content=cached.body, media_type="application/json", headers=headers)
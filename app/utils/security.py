@@ -1,9 +1,98 @@
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+
 from passlib.context import CryptContext
 
+from app.config import settings
+
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
\ No newline at end of file
+    return pwd_context.hash(password)
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when the hashing queue stays full for longer than the configured timeout."""
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt hashing and verification in a worker pool so the event loop
+    keeps serving other requests while a password is being checked.
+
+    At most ``workers + queue_size`` calls are admitted at once; further callers
+    wait up to ``queue_timeout`` seconds for a slot and then get PasswordHasherBusy.
+    """
+
+    def __init__(self, executor: str = "thread", workers: int = 4, queue_size: int = 64, queue_timeout: float = 5.0):
+        if executor not in ("thread", "process"):
+            raise ValueError(f"Unknown password hash executor: {executor}")
+        self.executor_kind = executor
+        self.workers = workers
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self._executor: Executor | None = None
+        self._slots: asyncio.Semaphore | None = None
+        self._in_flight = 0
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of calls admitted but not yet finished (running + queued)."""
+        return self._in_flight
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.executor_kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+        return self._executor
+
+    async def _run(self, func, *args):
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.workers + self.queue_size)
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            raise PasswordHasherBusy("Password hashing queue is full")
+
+        self._in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), func, *args)
+        finally:
+            self._in_flight -= 1
+            self._slots.release()
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(verify_password, plain_password, hashed_password)
+
+    async def hash(self, password: str) -> str:
+        return await self._run(get_password_hash, password)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# Admitted calls are capped at the pool's connections: a registration goes on to insert
+# the user, so more admitted calls than connections would just queue again on the pool
+password_hasher = PasswordHasher(
+    executor=settings.PASSWORD_HASH_EXECUTOR,
+    workers=settings.PASSWORD_HASH_WORKERS,
+    queue_size=max(0, min(
+        settings.PASSWORD_HASH_QUEUE_SIZE,
+        settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW - settings.PASSWORD_HASH_WORKERS,
+    )),
+    queue_timeout=settings.PASSWORD_HASH_QUEUE_TIMEOUT,
+)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await password_hasher.verify(plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    return await password_hasher.hash(password)
@@ -0,0 +1,17 @@
+"""
+One-pass JSON encoding for list endpoints whose rows come straight from SQL.
+
+Returning a Response makes FastAPI skip the response_model validation and the
+jsonable_encoder + json.dumps pass; orjson encodes the row dicts (datetimes,
+enums, floats) in a single pass instead.
+"""
+import orjson
+from fastapi.responses import ORJSONResponse
+
+# UTC as "Z", like pydantic, so output matches the validated endpoints
+ORJSON_OPTIONS = orjson.OPT_UTC_Z
+
+
+class RowsJSONResponse(ORJSONResponse):
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=ORJSON_OPTIONS)
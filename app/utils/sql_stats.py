@@ -0,0 +1,142 @@
+"""
+Per-request SQL instrumentation.
+
+Engine hooks add every statement's count and wall time to the current
+request's RequestSQLStats (a contextvar), along with the slowest
+SQL_SLOWEST_STATEMENTS statement fingerprints. ServerTimingMiddleware opens
+the stats for each HTTP request, reports them in a ``Server-Timing`` header
+and logs them as structured fields on the ``app.sql`` logger.
+"""
+import heapq
+import logging
+import random
+import re
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from sqlalchemy import event
+from starlette.datastructures import MutableHeaders
+
+from app.config import settings
+
+logger = logging.getLogger("app.sql")
+statement_logger = logging.getLogger("app.sql.statements")
+
+# The stats object is mutated in place, so statements run in SQLAlchemy's greenlets reach the request's stats
+_current: ContextVar["RequestSQLStats | None"] = ContextVar("sql_stats", default=None)
+
+_STRING_OR_NUMBER = re.compile(r"'(?:[^']|'')*'|\$\d+|\b\d+(?:\.\d+)?\b")
+_PARAMETER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+FINGERPRINT_LENGTH = 200
+
+
+def fingerprint(statement: str) -> str:
+    """Collapse whitespace, literals and placeholder lists so equal queries group together"""
+    text = _STRING_OR_NUMBER.sub("?", " ".join(statement.split()))
+    return _PARAMETER_LIST.sub("(?, ...)", text)[:FINGERPRINT_LENGTH]
+
+
+@dataclass
+class RequestSQLStats:
+    count: int = 0
+    seconds: float = 0.0
+    # Min-heap of (seconds, fingerprint) holding the slowest statements seen so far
+    slowest: list[tuple[float, str]] = field(default_factory=list)
+
+    def add(self, statement: str, seconds: float):
+        self.count += 1
+        self.seconds += seconds
+        if settings.SQL_SLOWEST_STATEMENTS <= 0:
+            return
+        entry = (seconds, statement)
+        if len(self.slowest) < settings.SQL_SLOWEST_STATEMENTS:
+            heapq.heappush(self.slowest, entry)
+        elif entry > self.slowest[0]:
+            heapq.heapreplace(self.slowest, entry)
+
+    def slowest_statements(self) -> list[dict]:
+        return [
+            {"ms": round(seconds * 1000, 2), "sql": fingerprint(statement)}
+            for seconds, statement in sorted(self.slowest, reverse=True)
+        ]
+
+
+def record(statement: str, seconds: float):
+    """Add a round trip that does not go through a cursor (e.g. COMMIT) to the request's stats"""
+    stats = _current.get()
+    if stats is not None:
+        stats.add(statement, seconds)
+
+
+def install(engine):
+    """Time statements sent through ``engine`` (only while a request is being measured)"""
+    event.listen(engine.sync_engine, "before_cursor_execute", _start_statement)
+    event.listen(engine.sync_engine, "after_cursor_execute", _finish_statement)
+
+
+def install_statement_log(engine, sample_rate: float):
+    """Log a ``sample_rate`` fraction of the statements sent through ``engine`` (without parameters)"""
+    def log_statement(conn, cursor, statement, parameters, context, executemany):
+        if sample_rate >= 1 or random.random() < sample_rate:
+            statement_logger.info(" ".join(statement.split()), extra={"executemany": executemany})
+
+    event.listen(engine.sync_engine, "before_cursor_execute", log_statement)
+
+
+def _start_statement(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and _current.get() is not None:
+        context._sql_started = time.perf_counter()
+
+
+def _finish_statement(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_sql_started", None)
+    if started is not None:
+        record(statement, time.perf_counter() - started)
+
+
+class ServerTimingMiddleware:
+    """Pure ASGI middleware measuring each HTTP request's DB time and total time"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestSQLStats()
+        token = _current.set(stats)
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_timing(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                total_ms = (time.perf_counter() - started) * 1000
+                MutableHeaders(scope=message).append(
+                    "Server-Timing",
+                    f'db;dur={stats.seconds * 1000:.2f};desc="{stats.count} statements", app;dur={total_ms:.2f}',
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            total_ms = (time.perf_counter() - started) * 1000
+            logger.info(
+                "%s %s %s %.1fms db=%.1fms statements=%d",
+                scope["method"], scope["path"], status_code, total_ms, stats.seconds * 1000, stats.count,
+                extra={
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "status_code": status_code,
+                    "duration_ms": round(total_ms, 2),
+                    "db_ms": round(stats.seconds * 1000, 2),
+                    "db_statements": stats.count,
+                    "slowest_statements": stats.slowest_statements(),
+                },
+            )
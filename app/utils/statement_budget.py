@@ -0,0 +1,68 @@
+"""
+Per-request SQL statement budgets, a dev/test guard against N+1 queries.
+
+With STATEMENT_BUDGET_MODE set to "warn" or "raise", every statement a
+request sends is counted (transaction control excluded) and compared with
+the route's budget: STATEMENT_BUDGET_DEFAULT, or what the endpoint declares
+with @statement_budget. "raise" fails the request with a 500 before it
+commits, so a test suite catches the regression.
+"""
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from sqlalchemy import event
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# A one-item list, so statements run in SQLAlchemy's greenlets add to the request's count
+_statements: ContextVar[list[int] | None] = ContextVar("statements", default=None)
+
+TRANSACTION_CONTROL = ("BEGIN", "COMMIT", "ROLLBACK", "SAVEPOINT", "RELEASE")
+
+
+class StatementBudgetExceeded(RuntimeError):
+    """Raised in "raise" mode when a request sends more statements than its route allows."""
+
+
+def statement_budget(limit: int | None):
+    """Endpoint decorator overriding STATEMENT_BUDGET_DEFAULT; None exempts the route"""
+    def decorate(endpoint):
+        endpoint.statement_budget = limit
+        return endpoint
+    return decorate
+
+
+def install(engine):
+    """Count statements sent through ``engine`` (only while a budget is being tracked)"""
+    event.listen(engine.sync_engine, "before_cursor_execute", _count_statement)
+
+
+def _count_statement(conn, cursor, statement, parameters, context, executemany):
+    counter = _statements.get()
+    if counter is not None and not statement.lstrip().upper().startswith(TRANSACTION_CONTROL):
+        counter[0] += 1
+
+
+@contextmanager
+def track(route: str, endpoint):
+    """Count the statements sent inside the block and enforce the route's budget on exit"""
+    budget = getattr(endpoint, "statement_budget", settings.STATEMENT_BUDGET_DEFAULT)
+    if settings.STATEMENT_BUDGET_MODE == "off" or budget is None:
+        yield
+        return
+
+    counter = [0]
+    token = _statements.set(counter)
+    try:
+        yield
+    finally:
+        _statements.reset(token)
+
+    if counter[0] > budget:
+        message = f"{route} sent {counter[0]} SQL statements, over its budget of {budget}"
+        if settings.STATEMENT_BUDGET_MODE == "raise":
+            raise StatementBudgetExceeded(message)
+        logger.warning(message)
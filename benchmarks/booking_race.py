@@ -0,0 +1,69 @@
+"""
+Double-booking race check.
+
+Fires N parallel POST /bookings requests at the same service and slot and
+exits non-zero unless exactly one of them is admitted and the rest get a 409.
+Runs in-process by default; pass --base-url to target a running deployment
+(e.g. several workers in front of PostgreSQL).
+
+    DATABASE_URL_DEV=sqlite+aiosqlite:///./bench.db python -m benchmarks.booking_race --requests 300
+    python -m benchmarks.booking_race --base-url http://localhost:8000 --requests 500
+"""
+import argparse
+import asyncio
+import random
+import sys
+import time
+from collections import Counter
+
+import httpx
+
+
+async def run(requests: int, base_url: str | None) -> Counter:
+    if base_url:
+        client = httpx.AsyncClient(base_url=base_url, timeout=60)
+    else:
+        from app.database import init_db
+        from app.main import app
+
+        await init_db()
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=60)
+
+    async with client:
+        credentials = {"name": "Race", "email": "race@example.com", "password": "benchpass", "role": "admin"}
+        response = await client.post("/api/auth/register", json=credentials)
+        if response.status_code != 201:
+            response = await client.post("/api/auth/login", json=credentials)
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+        service = {"title": "Race", "price": 10, "duration_minutes": 60}
+        service_id = (await client.post("/api/services/", json=service, headers=headers)).json()["id"]
+        # A fresh random slot per run so reruns against the same database start clean
+        slot = f"2040-{random.randint(1, 12):02d}-{random.randint(1, 28):02d}T{random.randint(0, 22):02d}:00:00"
+        booking = {"service_id": service_id, "start_time": slot}
+
+        started = time.perf_counter()
+        responses = await asyncio.gather(
+            *(client.post("/api/bookings/", json=booking, headers=headers) for _ in range(requests))
+        )
+        elapsed = time.perf_counter() - started
+
+    print(f"{requests} parallel bookings of one slot in {elapsed:.2f}s")
+    return Counter(response.status_code for response in responses)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--base-url", default=None)
+    args = parser.parse_args()
+
+    statuses = asyncio.run(run(args.requests, args.base_url))
+    print(f"status codes: {dict(statuses)}")
+    ok = statuses[201] == 1 and statuses[409] == args.requests - 1
+    print("ok: exactly one booking admitted" if ok else "FAILED: expected exactly one 201 and the rest 409")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
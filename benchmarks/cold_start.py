@@ -0,0 +1,90 @@
+"""
+Cold start benchmark.
+
+Starts ``uvicorn app.main:app`` in a fresh process and measures how long it
+takes until /ready answers 200 and until the first API request
+(GET /api/services/) completes, plus the bare ``import app.main`` time.
+The database must already be migrated (``alembic upgrade head``), or set
+CREATE_TABLES_ON_STARTUP=true for a throwaway SQLite file.
+
+    DATABASE_URL_DEV=sqlite+aiosqlite:///./bench.db CREATE_TABLES_ON_STARTUP=true python -m benchmarks.cold_start
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+
+import httpx
+
+IMPORT_PROBE = "import time; started = time.perf_counter(); import app.main; print(time.perf_counter() - started)"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def import_seconds() -> float:
+    output = subprocess.run([sys.executable, "-c", IMPORT_PROBE], capture_output=True, text=True, check=True)
+    return float(output.stdout.strip().splitlines()[-1])
+
+
+@contextmanager
+def uvicorn_server(env: dict | None = None, timeout: float = 60):
+    """Run ``uvicorn app.main:app`` in a subprocess; yields (base URL, seconds from spawn to /ready 200)"""
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        stdout=subprocess.DEVNULL,
+        env={**os.environ, **(env or {})},
+    )
+    try:
+        with httpx.Client(base_url=base_url, timeout=5) as client:
+            while True:
+                if time.perf_counter() - started > timeout:
+                    raise TimeoutError(f"/ready not 200 after {timeout}s")
+                if server.poll() is not None:
+                    raise RuntimeError(f"server exited with {server.returncode}")
+                try:
+                    if client.get("/ready").status_code == 200:
+                        break
+                except httpx.TransportError:
+                    pass
+                time.sleep(0.01)
+        yield base_url, time.perf_counter() - started
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def cold_start(timeout: float) -> tuple[float, float]:
+    """Seconds from process spawn to /ready == 200, and to the first API response"""
+    started = time.perf_counter()
+    with uvicorn_server(timeout=timeout) as (base_url, ready):
+        httpx.get(f"{base_url}/api/services/", timeout=5).raise_for_status()
+        first_request = time.perf_counter() - started
+    return ready, first_request
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--timeout", type=float, default=60)
+    args = parser.parse_args()
+
+    imports = [import_seconds() for _ in range(args.runs)]
+    starts = [cold_start(args.timeout) for _ in range(args.runs)]
+    print(f"import app.main       median {statistics.median(imports) * 1000:.0f} ms")
+    print(f"spawn -> /ready 200   median {statistics.median(ready for ready, _ in starts) * 1000:.0f} ms")
+    print(f"spawn -> first API    median {statistics.median(first for _, first in starts) * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
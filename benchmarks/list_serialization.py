@@ -0,0 +1,89 @@
+"""
+Micro-benchmark for rendering a page of bookings.
+
+Compares the previous path (a BookingWithServiceResponse built per row, then
+FastAPI's response_model validation and stdlib JSON encoding) with the
+current one (flat SQL rows encoded by orjson in one pass), and checks both
+produce the same JSON.
+
+    python -m benchmarks.list_serialization --rows 1000
+"""
+import argparse
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app.models.booking import BookingStatus
+from app.repositories.booking import BOOKING_ROW_KEYS
+from app.schemas.booking import BookingWithServiceResponse
+from app.services.booking import BookingService
+from app.utils.serialization import RowsJSONResponse
+
+
+def make_rows(count: int) -> list[tuple]:
+    start = datetime(2040, 1, 1, tzinfo=timezone.utc)
+    return [
+        (
+            n, 1, n % 20, start + timedelta(hours=n), start + timedelta(hours=n, minutes=30),
+            BookingStatus.CONFIRMED, start - timedelta(days=1, microseconds=n),
+            f"Service {n % 20}", 25.5, 30,
+        )
+        for n in range(1, count + 1)
+    ]
+
+
+async def old_path(rows, field) -> bytes:
+    objects = []
+    for row in rows:
+        values = dict(zip(BOOKING_ROW_KEYS, row))
+        booking = SimpleNamespace(**values)
+        service = SimpleNamespace(
+            title=values["service_title"], price=values["service_price"], duration_minutes=values["service_duration"]
+        )
+        objects.append(BookingService._with_service(booking, service))
+    content = await serialize_response(field=field, response_content=objects)
+    return JSONResponse(content).body
+
+
+def new_path(rows) -> bytes:
+    return RowsJSONResponse([dict(zip(BOOKING_ROW_KEYS, row)) for row in rows]).body
+
+
+def best_of(repeats: int, func) -> float:
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeats", type=int, default=50)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    field = create_response_field(name="bench", type_=list[BookingWithServiceResponse])
+    loop = asyncio.new_event_loop()
+
+    old_body = loop.run_until_complete(old_path(rows, field))
+    new_body = new_path(rows)
+    assert json.loads(old_body) == json.loads(new_body), "paths disagree"
+
+    old = best_of(args.repeats, lambda: loop.run_until_complete(old_path(rows, field)))
+    new = best_of(args.repeats, lambda: new_path(rows))
+    print(f"{args.rows} rows, best of {args.repeats}")
+    print(f"pydantic objects + response_model + json: {old * 1000:.2f} ms")
+    print(f"sql rows + orjson:                        {new * 1000:.2f} ms ({old / new:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
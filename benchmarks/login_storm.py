@@ -0,0 +1,76 @@
+"""
+Login storm benchmark.
+
+Fires a burst of concurrent logins at the app in-process and, at the same time,
+measures the latency of a non-auth route (GET /services). Run it once with the
+default worker pool and once with ``--inline`` (bcrypt on the event loop) to
+compare the p99 of the non-auth route.
+
+    DATABASE_URL_DEV=sqlite+aiosqlite:///./bench.db python -m benchmarks.login_storm
+    DATABASE_URL_DEV=sqlite+aiosqlite:///./bench.db python -m benchmarks.login_storm --inline
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+from app.database import init_db
+from app.main import app
+import app.services.auth as auth_service
+from app.utils.security import verify_password
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def run(logins: int, probes: int, inline: bool):
+    if inline:
+        async def verify_inline(plain_password, hashed_password):
+            return verify_password(plain_password, hashed_password)
+        auth_service.verify_password_async = verify_inline
+
+    await init_db()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        credentials = {"name": "Bench", "email": "bench@example.com", "password": "benchpass"}
+        await client.post("/api/auth/register", json=credentials)
+
+        async def login():
+            await client.post("/api/auth/login", json={"email": credentials["email"], "password": credentials["password"]})
+
+        async def probe(latencies):
+            for _ in range(probes):
+                started = time.perf_counter()
+                await client.get("/api/services/")
+                latencies.append((time.perf_counter() - started) * 1000)
+                await asyncio.sleep(0.005)
+
+        latencies = []
+        started = time.perf_counter()
+        await asyncio.gather(probe(latencies), *(login() for _ in range(logins)))
+        elapsed = time.perf_counter() - started
+
+    mode = "inline" if inline else "pool"
+    print(f"mode={mode} logins={logins} elapsed={elapsed:.2f}s")
+    print(
+        f"GET /services latency ms: p50={statistics.median(latencies):.1f} "
+        f"p99={percentile(latencies, 99):.1f} max={max(latencies):.1f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=50)
+    parser.add_argument("--probes", type=int, default=200)
+    parser.add_argument("--inline", action="store_true", help="verify passwords on the event loop")
+    args = parser.parse_args()
+    asyncio.run(run(args.logins, args.probes, args.inline))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Metrics recording overhead.
+
+Drives a trivial ASGI app directly, bare and wrapped in MetricsMiddleware,
+and exits non-zero unless the middleware adds less than --budget-us
+microseconds per request.
+
+    python -m benchmarks.metrics_overhead --requests 200000
+"""
+import argparse
+import asyncio
+import sys
+import time
+from types import SimpleNamespace
+
+from app.utils.metrics import MetricsMiddleware, MetricsRegistry
+
+ROUTE = SimpleNamespace(path="/api/bookings/{booking_id}")
+START = {"type": "http.response.start", "status": 200, "headers": []}
+BODY = {"type": "http.response.body", "body": b"{}"}
+
+
+async def endpoint(scope, receive, send):
+    scope["route"] = ROUTE
+    await send(START)
+    await send(BODY)
+
+
+async def receive():
+    return {"type": "http.request", "body": b""}
+
+
+async def send(message):
+    pass
+
+
+async def per_request_us(app, requests: int) -> float:
+    started = time.perf_counter()
+    for _ in range(requests):
+        await app({"type": "http", "method": "GET", "path": "/api/bookings/1"}, receive, send)
+    return (time.perf_counter() - started) / requests * 1e6
+
+
+async def run(requests: int) -> tuple[float, float]:
+    wrapped = MetricsMiddleware(endpoint, MetricsRegistry())
+    # Warm up both paths, then take the best of a few rounds to damp scheduler noise
+    await per_request_us(endpoint, 1000)
+    await per_request_us(wrapped, 1000)
+    bare = min([await per_request_us(endpoint, requests) for _ in range(3)])
+    measured = min([await per_request_us(wrapped, requests) for _ in range(3)])
+    return bare, measured
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=100000)
+    parser.add_argument("--budget-us", type=float, default=20.0)
+    args = parser.parse_args()
+
+    bare, measured = asyncio.run(run(args.requests))
+    overhead = measured - bare
+    print(f"bare app {bare:.2f} us/request, with metrics {measured:.2f} us/request")
+    print(f"overhead {overhead:.2f} us/request (budget {args.budget_us:.0f} us)")
+    sys.exit(0 if overhead < args.budget_us else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Throughput across connection pool sizes.
+
+For each DB_POOL_SIZE in --sizes, starts the app under uvicorn (one worker,
+DB_MAX_OVERFLOW=0) and drives it with --concurrency clients for --seconds,
+mixing the admin booking list with single-booking reads, both of which
+need a database connection on every request. Prints requests/s, latency
+percentiles and how many requests were shed with a 503 because the pool
+stayed saturated for DB_POOL_TIMEOUT. Meant for PostgreSQL:
+
+    ENV=production DATABASE_URL_PROD=postgresql://... python -m benchmarks.pool_sizes --sizes 1,2,5,10,20
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+from collections import Counter
+
+import httpx
+
+from benchmarks.cold_start import uvicorn_server
+from benchmarks.login_storm import percentile
+
+
+async def setup(client: httpx.AsyncClient) -> tuple[dict, int]:
+    """Register an admin and create a service with a few bookings; returns auth headers and a booking id"""
+    credentials = {"name": "Pool", "email": f"pool-{uuid.uuid4().hex[:8]}@example.com", "password": "benchpass", "role": "admin"}
+    response = await client.post("/api/auth/register", json=credentials)
+    response.raise_for_status()
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    service = {"title": "Pool", "price": 10, "duration_minutes": 30}
+    service_id = (await client.post("/api/services/", json=service, headers=headers)).json()["id"]
+    for day in range(1, 21):
+        booking = {"service_id": service_id, "start_time": f"2041-01-{day:02d}T10:00:00"}
+        response = await client.post("/api/bookings/", json=booking, headers=headers)
+    return headers, response.json()["id"]
+
+
+async def drive(base_url: str, concurrency: int, seconds: float) -> tuple[list[float], Counter, float]:
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=30, limits=limits) as client:
+        headers, booking_id = await setup(client)
+        latencies, statuses = [], Counter()
+        deadline = time.perf_counter() + seconds
+
+        async def worker(number: int):
+            sent = 0
+            while time.perf_counter() < deadline:
+                if (number + sent) % 2:
+                    request = client.get("/api/bookings/", params={"limit": 20}, headers=headers)
+                else:
+                    request = client.get(f"/api/bookings/{booking_id}", headers=headers)
+                started = time.perf_counter()
+                response = await request
+                latencies.append((time.perf_counter() - started) * 1000)
+                statuses[response.status_code] += 1
+                sent += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(number) for number in range(concurrency)))
+        return latencies, statuses, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1,2,5,10,20")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--pool-timeout", default="5")
+    args = parser.parse_args()
+
+    print(f"{'pool':>4} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'503s':>6}")
+    for size in args.sizes.split(","):
+        env = {"DB_POOL_SIZE": size, "DB_MAX_OVERFLOW": "0", "DB_POOL_TIMEOUT": args.pool_timeout, "DB_POOL_WARMUP": size}
+        with uvicorn_server(env) as (base_url, _):
+            latencies, statuses, elapsed = asyncio.run(drive(base_url, args.concurrency, args.seconds))
+        print(
+            f"{size:>4} {len(latencies) / elapsed:>8.0f} {statistics.median(latencies):>8.1f} "
+            f"{percentile(latencies, 99):>8.1f} {statuses[503]:>6}"
+        )
+
+
+if __name__ == "__main__":
+    main()
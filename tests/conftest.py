@@ -0,0 +1,81 @@
+"""
+Tests run the app in-process against a fresh SQLite file per test, through
+httpx's ASGI transport (the lifespan is not run; tables come from init_db).
+"""
+import os
+
+# Before app.config is imported: the checked-in .env points at PostgreSQL
+os.environ.update({
+    "ENV": "development",
+    "DATABASE_URL_DEV": "sqlite+aiosqlite:///./test.db",
+    "DATABASE_URL_REPLICA": "",
+    "LOG_LEVEL": "WARNING",
+})
+
+import httpx
+import pytest
+from sqlalchemy import event
+
+from app.auth.cache import principal_cache
+from app.auth.jwt import _verified_tokens
+from app.config import settings
+from app.database import dispose_engine, get_engine, init_db, recent_writers
+from app.main import app
+from app.services.booking import booking_index
+from app.services.service import catalog_cache
+from app.utils.security import password_hasher
+from app.utils.statement_budget import TRANSACTION_CONTROL
+
+
+@pytest.fixture
+async def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "DATABASE_URL_DEV", f"sqlite+aiosqlite:///{tmp_path / 'test.db'}")
+    # Process-wide caches outlive a test; the semaphore belongs to the previous test's event loop
+    for cache in (principal_cache, _verified_tokens, recent_writers, booking_index):
+        cache.clear()
+    catalog_cache.bump()
+    password_hasher._slots = None
+
+    await init_db()
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+    await dispose_engine()
+
+
+@pytest.fixture
+def register(client):
+    """Register a user and return their Authorization header"""
+    async def register(email: str = "admin@example.com", role: str = "admin") -> dict:
+        credentials = {"name": email, "email": email, "password": "testpass", "role": role}
+        response = await client.post("/api/auth/register", json=credentials)
+        assert response.status_code == 201, response.text
+        return {"Authorization": f"Bearer {response.json()['access_token']}"}
+    return register
+
+
+@pytest.fixture
+async def admin(register) -> dict:
+    return await register()
+
+
+@pytest.fixture
+async def service_id(client, admin) -> int:
+    service = {"title": "Haircut", "price": 10, "duration_minutes": 30}
+    response = await client.post("/api/services/", json=service, headers=admin)
+    assert response.status_code == 201, response.text
+    return response.json()["id"]
+
+
+@pytest.fixture
+def statements(client):
+    """List of the statements sent to the primary engine, transaction control excluded; clear() it to start counting"""
+    sent = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if not statement.lstrip().upper().startswith(TRANSACTION_CONTROL):
+            sent.append(statement)
+
+    engine = get_engine().sync_engine
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    yield sent
+    event.remove(engine, "before_cursor_execute", before_cursor_execute)
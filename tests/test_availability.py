@@ -0,0 +1,40 @@
+"""
+GET /services/{id}/availability: slots come back as aware UTC, and the
+window bounds may be given with or without an offset (naive ones are UTC).
+"""
+import pytest
+
+
+@pytest.fixture
+async def booked(client, admin, service_id):
+    """A 30-minute booking at 10:00 UTC"""
+    booking = {"service_id": service_id, "start_time": "2040-01-01T10:00:00Z"}
+    response = await client.post("/api/bookings/", json=booking, headers=admin)
+    assert response.status_code == 201, response.text
+
+
+async def availability(client, service_id: int, start: str, end: str):
+    return await client.get(f"/api/services/{service_id}/availability", params={"from": start, "to": end})
+
+
+def starts(response) -> list[str]:
+    return [slot["start_time"] for slot in response.json()["slots"]]
+
+
+@pytest.mark.parametrize("start, end", [
+    ("2040-01-01T09:00:00", "2040-01-01T11:00:00"),
+    ("2040-01-01T09:00:00Z", "2040-01-01T11:00:00Z"),
+    ("2040-01-01T11:00:00+02:00", "2040-01-01T13:00:00+02:00"),
+    ("2040-01-01T09:00:00Z", "2040-01-01T11:00:00"),
+    ("2040-01-01T09:00:00", "2040-01-01T13:00:00+02:00"),
+])
+async def test_bounds_with_and_without_offsets(client, service_id, booked, start, end):
+    response = await availability(client, service_id, start, end)
+    assert response.status_code == 200, response.text
+    assert starts(response) == ["2040-01-01T09:00:00Z", "2040-01-01T09:30:00Z", "2040-01-01T10:30:00Z"]
+
+
+async def test_to_before_from_across_offsets(client, service_id):
+    # 10:00+02:00 is 08:00 UTC, before the naive (UTC) 09:00
+    response = await availability(client, service_id, "2040-01-01T09:00:00", "2040-01-01T10:00:00+02:00")
+    assert response.status_code == 400
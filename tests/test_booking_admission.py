@@ -0,0 +1,72 @@
+import asyncio
+from collections import Counter
+
+import pytest
+from sqlalchemy import insert, select, update
+
+from app.database import AsyncSessionLocal, begin_write, commit
+from app.models.booking import Booking, BookingStatus
+from app.models.service import Service
+
+
+async def test_parallel_bookings_of_one_slot_admit_exactly_one(client, admin, service_id):
+    booking = {"service_id": service_id, "start_time": "2040-03-01T10:00:00"}
+    responses = await asyncio.gather(
+        *(client.post("/api/bookings/", json=booking, headers=admin) for _ in range(200))
+    )
+    statuses = Counter(response.status_code for response in responses)
+    assert statuses == {201: 1, 409: 199}
+
+
+async def test_parallel_cancellations_of_one_booking(client, admin, service_id):
+    booking = {"service_id": service_id, "start_time": "2040-03-01T10:00:00"}
+    booking_id = (await client.post("/api/bookings/", json=booking, headers=admin)).json()["id"]
+    responses = await asyncio.gather(
+        *(client.delete(f"/api/bookings/{booking_id}", headers=admin) for _ in range(20))
+    )
+    statuses = Counter(response.status_code for response in responses)
+    assert statuses == {200: 1, 400: 19}
+
+
+async def test_parallel_service_creation(client, admin):
+    service = {"title": "Shave", "price": 5, "duration_minutes": 15}
+    responses = await asyncio.gather(
+        *(client.post("/api/services/", json=service, headers=admin) for _ in range(20))
+    )
+    assert Counter(response.status_code for response in responses) == {201: 20}
+
+async def test_slot_cancelled_by_another_session_can_be_rebooked(client, admin, service_id):
+    booking = {"service_id": service_id, "start_time": "2040-03-01T10:00:00"}
+    response = await client.post("/api/bookings/", json=booking, headers=admin)
+    assert response.status_code == 201, response.text
+    booking_id = response.json()["id"]
+
+    # Cancelled behind this worker's back, so its interval index still holds the booking
+    async with AsyncSessionLocal() as session:
+        await session.execute(update(Booking).where(Booking.id == booking_id).values(status=BookingStatus.CANCELLED))
+        await session.commit()
+
+    response = await client.post("/api/bookings/", json=booking, headers=admin)
+    assert response.status_code == 201, response.text
+    response = await client.post("/api/bookings/", json=booking, headers=admin)
+    assert response.status_code == 409
+    assert response.json()["conflicting_booking"]["id"] != booking_id
+
+
+async def test_begin_write_ends_a_read_only_transaction(client, service_id):
+    async with AsyncSessionLocal() as session:
+        await session.execute(select(Service))
+        await begin_write(session)
+        await session.execute(insert(Service).values(title="Shave", price=5, duration_minutes=15))
+        await commit(session)
+
+    async with AsyncSessionLocal() as session:
+        assert len((await session.execute(select(Service))).all()) == 2
+
+
+async def test_begin_write_refuses_to_split_a_unit_of_work(client):
+    async with AsyncSessionLocal() as session:
+        await session.execute(insert(Service).values(title="Shave", price=5, duration_minutes=15))
+        with pytest.raises(RuntimeError):
+            await begin_write(session)
+        await session.rollback()
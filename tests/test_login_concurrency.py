@@ -0,0 +1,34 @@
+"""
+Logins wait for a password hasher worker without holding a pooled
+connection, so a burst of logins larger than the pool is not shed with 503s.
+"""
+import asyncio
+from collections import Counter
+
+import pytest
+
+from app.config import settings
+from app.database import dispose_engine, get_engine
+from app.utils.security import password_hasher
+
+LOGINS = 20
+
+
+@pytest.fixture
+async def small_pool(client, monkeypatch):
+    """Rebuild the engine with one connection and a short pool timeout; the hasher queue waits longer"""
+    monkeypatch.setattr(settings, "DB_POOL_SIZE", 1)
+    monkeypatch.setattr(settings, "DB_MAX_OVERFLOW", 0)
+    monkeypatch.setattr(settings, "DB_POOL_TIMEOUT", 1)
+    monkeypatch.setattr(password_hasher, "queue_timeout", 30)
+    await dispose_engine()
+    get_engine()
+
+
+async def test_concurrent_logins_are_not_shed(client, admin, small_pool):
+    credentials = {"email": "admin@example.com", "password": "testpass"}
+    responses = await asyncio.gather(
+        *(client.post("/api/auth/login", json=credentials) for _ in range(LOGINS))
+    )
+    statuses = Counter(response.status_code for response in responses)
+    assert statuses == {200: LOGINS}
@@ -0,0 +1,36 @@
+"""
+/metrics serves the hit and miss counts of the in-process caches (counted
+per worker since it started, so the tests compare before and after).
+"""
+
+
+async def scrape(client) -> dict[str, float]:
+    response = await client.get("/metrics")
+    assert response.status_code == 200
+    return {
+        name: float(value)
+        for name, value in (line.split(" ") for line in response.text.splitlines() if not line.startswith("#"))
+    }
+
+
+async def test_catalog_cache_gauges(client, service_id):
+    before = await scrape(client)
+    for _ in range(3):
+        assert (await client.get(f"/api/services/{service_id}")).status_code == 200
+    after = await scrape(client)
+
+    assert after["catalog_cache_misses"] - before["catalog_cache_misses"] == 1
+    assert after["catalog_cache_hits"] - before["catalog_cache_hits"] == 2
+    assert after["catalog_cache_entries"] == before["catalog_cache_entries"] + 1
+
+
+async def test_token_cache_gauges(client, admin):
+    before = await scrape(client)
+    for _ in range(3):
+        assert (await client.get("/api/bookings/", headers=admin)).status_code == 200
+    after = await scrape(client)
+
+    # The token was issued at registration and is first verified by the first request
+    assert after["token_cache_misses"] - before["token_cache_misses"] == 1
+    assert after["token_cache_hits"] - before["token_cache_hits"] == 2
+    assert after["token_cache_entries"] == 1
@@ -0,0 +1,68 @@
+"""
+Read-replica routing, with a second SQLite file standing in for the
+replica. It only changes when a test copies the primary over it (SQLite's
+backup API), so replication lag is whatever the test says it is.
+"""
+import sqlite3
+
+import pytest
+
+from app.config import settings
+from app.database import recent_writers
+
+
+@pytest.fixture
+def replicate(client, tmp_path, monkeypatch):
+    """Point DATABASE_URL_REPLICA at a copy of the primary; call the returned function to catch it up"""
+    primary, replica = tmp_path / "test.db", tmp_path / "replica.db"
+
+    def replicate():
+        with sqlite3.connect(primary) as source, sqlite3.connect(replica) as target:
+            source.backup(target)
+
+    monkeypatch.setattr(settings, "DATABASE_URL_REPLICA", f"sqlite+aiosqlite:///{replica}")
+    return replicate
+
+
+async def test_read_your_writes(client, admin, register, service_id, replicate):
+    replicate()
+    # Written to the primary only: the replica is now behind by one booking
+    booking = {"service_id": service_id, "start_time": "2042-01-01T10:00:00"}
+    response = await client.post("/api/bookings/", json=booking, headers=admin)
+    assert response.status_code == 201, response.text
+    booking_id = response.json()["id"]
+    reader = await register("reader@example.com")
+
+    # The writer reads their own write from the primary, inside the window
+    response = await client.get(f"/api/bookings/{booking_id}", headers=admin)
+    assert response.status_code == 200
+
+    # Another user's read-only route reads the stale replica
+    response = await client.get("/api/bookings/", headers=reader)
+    assert response.json() == []
+
+    # Once the window has passed, the writer reads the replica too
+    recent_writers.clear()
+    response = await client.get(f"/api/bookings/{booking_id}", headers=admin)
+    assert response.status_code == 404
+
+    replicate()
+    response = await client.get(f"/api/bookings/{booking_id}", headers=admin)
+    assert response.status_code == 200
+
+
+async def test_cached_catalog_is_not_rendered_from_the_replica(client, admin, register, service_id, replicate):
+    replicate()
+    response = await client.patch(f"/api/services/{service_id}", json={"price": 12}, headers=admin)
+    assert response.status_code == 200, response.text
+    reader = await register("reader@example.com")
+
+    # The replica still has the old price; the shared cache must not pick it up
+    response = await client.get(f"/api/services/{service_id}", headers=reader)
+    assert response.json()["price"] == 12
+    response = await client.get("/api/services/", headers=reader)
+    assert [service["price"] for service in response.json()] == [12]
+
+    recent_writers.clear()
+    response = await client.get(f"/api/services/{service_id}", headers=admin)
+    assert response.json()["price"] == 12
@@ -0,0 +1,77 @@
+"""
+STATEMENT_BUDGET_MODE=raise, the mode a test run uses to catch N+1 queries:
+an over-budget request fails with a 500 before it commits, and the list
+endpoints stay within the default budget however many rows they return.
+"""
+import logging
+
+import httpx
+import pytest
+
+from app.config import settings
+from app.main import app
+from app.utils.statement_budget import StatementBudgetExceeded
+
+ROWS = 5
+
+
+@pytest.fixture
+def budget(monkeypatch):
+    monkeypatch.setattr(settings, "STATEMENT_BUDGET_MODE", "raise")
+    return monkeypatch
+
+
+@pytest.fixture
+async def reviewed(client, admin, service_id):
+    """ROWS completed bookings of the service, each reviewed"""
+    for day in range(1, ROWS + 1):
+        booking = {"service_id": service_id, "start_time": f"2040-01-{day:02d}T10:00:00"}
+        response = await client.post("/api/bookings/", json=booking, headers=admin)
+        assert response.status_code == 201, response.text
+        booking_id = response.json()["id"]
+        response = await client.patch(f"/api/bookings/{booking_id}", json={"status": "completed"}, headers=admin)
+        assert response.status_code == 200, response.text
+        response = await client.post("/api/reviews/", json={"booking_id": booking_id, "rating": 4}, headers=admin)
+        assert response.status_code == 201, response.text
+
+
+async def test_over_budget_raises(client, admin, budget):
+    budget.setattr(settings, "STATEMENT_BUDGET_DEFAULT", 0)
+    with pytest.raises(StatementBudgetExceeded):
+        await client.get("/api/services/", headers=admin)
+
+
+async def test_over_budget_is_a_500_and_not_committed(client, admin, budget):
+    budget.setattr(settings, "STATEMENT_BUDGET_DEFAULT", 0)
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as unchecked:
+        service = {"title": "Shave", "price": 5, "duration_minutes": 15}
+        response = await unchecked.post("/api/services/", json=service, headers=admin)
+    assert response.status_code == 500
+
+    budget.setattr(settings, "STATEMENT_BUDGET_MODE", "off")
+    response = await client.get("/api/services/", headers=admin)
+    assert response.json() == []
+
+
+async def test_warn_mode_logs(client, admin, monkeypatch, caplog):
+    monkeypatch.setattr(settings, "STATEMENT_BUDGET_MODE", "warn")
+    monkeypatch.setattr(settings, "STATEMENT_BUDGET_DEFAULT", 0)
+    with caplog.at_level(logging.WARNING, logger="app.utils.statement_budget"):
+        response = await client.get("/api/services/", headers=admin)
+    assert response.status_code == 200
+    assert "over its budget of 0" in caplog.text
+
+
+@pytest.mark.parametrize("path", [
+    "/api/services/",
+    "/api/services/?q=haircut",
+    "/api/services/{service_id}",
+    "/api/services/{service_id}/ratings",
+    "/api/bookings/",
+    "/api/bookings/?fields=id,start_time,status,service_title",
+    "/api/reviews/services/{service_id}/reviews",
+])
+async def test_list_endpoints_within_budget(client, admin, service_id, reviewed, budget, path):
+    response = await client.get(path.format(service_id=service_id), headers=admin)
+    assert response.status_code == 200, response.text
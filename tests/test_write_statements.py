@@ -0,0 +1,53 @@
+"""
+Statement counts of the write paths, so a change that brings back a
+commit-then-refresh or a re-fetch after a write fails here. Counted with
+warm caches: the principal cache and the service's booking interval index
+are loaded before anything is counted.
+"""
+import pytest
+
+# SQLite has no exclusion constraint, so booking admission also asks the table
+ADMISSION_CHECK = 1
+
+
+def booking(service_id: int, day: int) -> dict:
+    return {"service_id": service_id, "start_time": f"2040-01-{day:02d}T10:00:00"}
+
+
+@pytest.fixture
+async def booking_id(client, admin, service_id) -> int:
+    response = await client.post("/api/bookings/", json=booking(service_id, 1), headers=admin)
+    assert response.status_code == 201, response.text
+    return response.json()["id"]
+
+
+async def test_create_booking(client, admin, service_id, booking_id, statements):
+    statements.clear()
+    response = await client.post("/api/bookings/", json=booking(service_id, 2), headers=admin)
+    assert response.status_code == 201
+    # service lookup, INSERT ... RETURNING
+    assert len(statements) <= 2 + ADMISSION_CHECK, statements
+
+
+async def test_reschedule_booking(client, admin, service_id, booking_id, statements):
+    statements.clear()
+    response = await client.patch(f"/api/bookings/{booking_id}", json=booking(service_id, 3), headers=admin)
+    assert response.status_code == 200
+    # booking+service join, UPDATE ... RETURNING
+    assert len(statements) <= 2 + ADMISSION_CHECK, statements
+
+
+async def test_create_service(client, admin, service_id, statements):
+    statements.clear()
+    response = await client.post("/api/services/", json={"title": "Shave", "price": 5, "duration_minutes": 15}, headers=admin)
+    assert response.status_code == 201
+    # INSERT ... RETURNING
+    assert len(statements) <= 1, statements
+
+
+async def test_update_service(client, admin, service_id, statements):
+    statements.clear()
+    response = await client.patch(f"/api/services/{service_id}", json={"price": 12}, headers=admin)
+    assert response.status_code == 200
+    # existence check, UPDATE ... RETURNING
+    assert len(statements) <= 2, statements